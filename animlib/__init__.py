@@ -8,6 +8,7 @@ from animlib.geometies.svg import SVG
 from animlib.geometies.rect import Rect
 from animlib.geometies.circle import Circle
 from animlib.geometies.latex import Latex
+from animlib.geometies.collection import Collection
 
 from animlib.utils.colors import ColorMap
 import numpy as np
@@ -2,18 +2,36 @@ from animlib.geometies.base import Base
 from animlib.utils.colors import ColorComponent
 from enum import Enum, unique
 import numpy as np
-import sys
+import sys, functools
 try:
     import cairo
 except:
     import cairocffi as cairo
 
 class EaseFun():
+    """ Wraps an easing function that evaluates floats as well as NumPy arrays of percentages """
     def __init__(self, fun):
         self._fun = fun
 
-    def __call__(self, *args, **kwargs):
-        return self._fun(*args, **kwargs)
+    def __call__(self, p, *args, **kwargs):
+        result = self._fun(np.asarray(p, dtype=float), *args, **kwargs)
+        return float(result) if np.ndim(result) == 0 else result
+
+# constants of the back and elastic easings (see https://easings.net/)
+_BACK = 1.70158
+_BACK_IN_OUT = _BACK * 1.525
+_ELASTIC = 2 * np.pi / 3
+_ELASTIC_IN_OUT = 2 * np.pi / 4.5
+
+def _outBounce(p):
+    return np.select(
+        [p < 1/2.75, p < 2/2.75, p < 2.5/2.75],
+        [7.5625*p*p, 7.5625*(p-1.5/2.75)**2+0.75, 7.5625*(p-2.25/2.75)**2+0.9375],
+        7.5625*(p-2.625/2.75)**2+0.984375)
+
+def _sqrt(x):
+    # NB: `np.where` evaluates both branches, i.e. also outside of their domain
+    return np.sqrt(np.maximum(x, 0.0))
 
 @unique
 class Ease(Enum):
@@ -24,27 +42,97 @@ class Ease(Enum):
     `Ease.LINEAR == Ease.OUT_QUAD` returns `False`\n
     `Ease.OUT_QUAD == Ease.OUT_QUAD` returns `True`\n
     `Ease.LINEAR(0.5)` returns `0.5`\n
-    `Ease.OUT_QUAD(0.5)` returns `0.25`
+    `Ease.OUT_QUAD(0.5)` returns `0.75`\n
+    `Ease.OUT_QUAD(np.array((0.0, 0.5)))` returns `array([0., 0.75])`
     """
     LINEAR =         EaseFun(lambda p: p)
     IN_QUAD =        EaseFun(lambda p: p*p)
     OUT_QUAD =       EaseFun(lambda p: p*(2-p))
-    IN_OUT_QUAD =    EaseFun(lambda p: 2*p*p if p < 0.5 else (4-2*p)*p-1)
+    IN_OUT_QUAD =    EaseFun(lambda p: np.where(p < 0.5, 2*p*p, (4-2*p)*p-1))
     IN_CUBIC =       EaseFun(lambda p: p*p*p)
-    OUT_CUBIC =      EaseFun(lambda p: p*(p*(+-3*p)+3))
-    IN_OUT_CUBIC =   EaseFun(lambda p: 4*p*p*p if p < 0.5 else p*(p*(p*4-12)+12)-3)
+    OUT_CUBIC =      EaseFun(lambda p: p*(p*(p-3)+3))
+    IN_OUT_CUBIC =   EaseFun(lambda p: np.where(p < 0.5, 4*p*p*p, p*(p*(p*4-12)+12)-3))
     IN_QUART =       EaseFun(lambda p: p*p*p*p)
     OUT_QUART =      EaseFun(lambda p: p*(p*(p*(4-p)-6)+4))
-    IN_OUT_QUART =   EaseFun(lambda p: 8*p*p*p*p if p < 0.5 else p*(p*(p*(32-8*p)-48)+32)-7)
-    # experimental using order (o): may be slow
+    IN_OUT_QUART =   EaseFun(lambda p: np.where(p < 0.5, 8*p*p*p*p, p*(p*(p*(32-8*p)-48)+32)-7))
+    # using order (o), see `Animation` kwarg `order`
     IN_ORDER =       EaseFun(lambda p, o: p**o)
-    OUT_ORDER =      EaseFun(lambda p, o: 1-abs((p-1)**o))
-    IN_OUT_ORDER =   EaseFun(lambda p, o: p*(2*p)**(o-1) if p < 0.5 else 1-abs((p-1)*(2*p-2)**(o-1)))
-    # TODO: implement sine, circ, elastic, expo, back and bounce (see https://easings.net/)
+    OUT_ORDER =      EaseFun(lambda p, o: 1-np.abs(p-1)**o)
+    IN_OUT_ORDER =   EaseFun(lambda p, o: np.where(p < 0.5, p*(2*p)**(o-1), 1-np.abs((p-1)*np.abs(2*p-2)**(o-1))))
+    IN_SINE =        EaseFun(lambda p: 1-np.cos(p*np.pi/2))
+    OUT_SINE =       EaseFun(lambda p: np.sin(p*np.pi/2))
+    IN_OUT_SINE =    EaseFun(lambda p: (1-np.cos(p*np.pi))/2)
+    IN_CIRC =        EaseFun(lambda p: 1-_sqrt(1-p*p))
+    OUT_CIRC =       EaseFun(lambda p: _sqrt(1-(p-1)**2))
+    IN_OUT_CIRC =    EaseFun(lambda p: np.where(p < 0.5, (1-_sqrt(1-(2*p)**2))/2, (_sqrt(1-(2-2*p)**2)+1)/2))
+    IN_EXPO =        EaseFun(lambda p: np.where(p <= 0, 0.0, 2**(10*p-10)))
+    OUT_EXPO =       EaseFun(lambda p: np.where(p >= 1, 1.0, 1-2**(-10*p)))
+    IN_OUT_EXPO =    EaseFun(lambda p: np.select([p <= 0, p >= 1, p < 0.5], [0.0, 1.0, 2**(20*p-10)/2], (2-2**(10-20*p))/2))
+    IN_BACK =        EaseFun(lambda p: (_BACK+1)*p*p*p-_BACK*p*p)
+    OUT_BACK =       EaseFun(lambda p: 1+(_BACK+1)*(p-1)**3+_BACK*(p-1)**2)
+    IN_OUT_BACK =    EaseFun(lambda p: np.where(p < 0.5,
+                        (2*p)**2*((_BACK_IN_OUT+1)*2*p-_BACK_IN_OUT)/2,
+                        ((2*p-2)**2*((_BACK_IN_OUT+1)*(2*p-2)+_BACK_IN_OUT)+2)/2))
+    IN_ELASTIC =     EaseFun(lambda p: np.select([p <= 0, p >= 1], [0.0, 1.0], -2**(10*p-10)*np.sin((10*p-10.75)*_ELASTIC)))
+    OUT_ELASTIC =    EaseFun(lambda p: np.select([p <= 0, p >= 1], [0.0, 1.0], 2**(-10*p)*np.sin((10*p-0.75)*_ELASTIC)+1))
+    IN_OUT_ELASTIC = EaseFun(lambda p: np.select([p <= 0, p >= 1, p < 0.5], [0.0, 1.0,
+                        -2**(20*p-10)*np.sin((20*p-11.125)*_ELASTIC_IN_OUT)/2],
+                        2**(10-20*p)*np.sin((20*p-11.125)*_ELASTIC_IN_OUT)/2+1))
+    IN_BOUNCE =      EaseFun(lambda p: 1-_outBounce(1-p))
+    OUT_BOUNCE =     EaseFun(lambda p: _outBounce(p))
+    IN_OUT_BOUNCE =  EaseFun(lambda p: np.where(p < 0.5, (1-_outBounce(1-2*p))/2, (1+_outBounce(2*p-1))/2))
 
     def __call__(self, *args, **kwargs):
         return self.value(*args, **kwargs)
 
+    def hasOrder(self) -> bool:
+        """ Returns whether the easing function takes an order (o) """
+        return self.name.endswith("_ORDER")
+
+@functools.lru_cache(maxsize=256)
+def _easeTable(ease, order, length):
+    """
+    Returns the (read-only) easing values of each iteration of an animation
+    of `length` iterations and their differences to the previous iteration
+    """
+    p = np.arange(length) / length # FIXME: the -1 issue for frame counting
+    easeVals = ease(p, order) if ease.hasOrder() else ease(p)
+    easeVals = np.array(easeVals, dtype=float).reshape((-1,))
+    easeDeltas = np.concatenate((np.array((0.0,)), np.diff(easeVals)))
+    easeVals.flags.writeable = False
+    easeDeltas.flags.writeable = False
+    return easeVals, easeDeltas
+
+# attributes of `Animation` itself, which `Animation.updateHash` hashes explicitly or which change while animating
+_ANIMATION_ATTRIBUTES = frozenset((
+    "_targetObjects", "_animatedObjects", "_animTime", "_fps", "_easeFun", "_order",
+    "_animCounter", "_easeVals", "_easeDeltas"))
+
+def _updateHashWith(hasher, value):
+    """
+    Feeds `value` (e.g. a parameter of an animation) into `hasher`.\n
+    Objects without a specific case are fed by `repr`, which for most classes
+    contains their address, i.e. never matches a previous run (rather than
+    wrongly matching one)
+    """
+    if isinstance(value, Base):
+        value.updateHash(hasher)
+    elif isinstance(value, (list, tuple)):
+        hasher.update("{}[{}]".format(type(value).__name__, len(value)).encode())
+        [_updateHashWith(hasher, v) for v in value]
+    elif isinstance(value, dict):
+        hasher.update("dict[{}]".format(len(value)).encode())
+        for k in sorted(value.keys(), key=repr):
+            _updateHashWith(hasher, k)
+            _updateHashWith(hasher, value[k])
+    elif isinstance(value, np.ndarray):
+        hasher.update(repr((value.dtype.str, value.shape)).encode())
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, Enum):
+        hasher.update("{}.{}".format(type(value).__name__, value.name).encode())
+    else:
+        hasher.update(repr(value).encode())
+
 class Animation:
     def __init__(self, *args, **kwargs):
         
@@ -56,6 +144,7 @@ class Animation:
         self._animTime = 1.0
         self._fps = 60.0
         self._easeFun = Ease.IN_OUT_QUAD
+        self._order = 2.0
 
         for key in kwargs.keys():
             arg = kwargs[key]
@@ -83,6 +172,8 @@ class Animation:
                 self._fps = float(arg)
             if key in ["easingFunction", "easing_function", "easeFun", "ease_fun"] and isinstance(arg, Ease):
                 self._easeFun = arg
+            if key in ["order", "easeOrder", "ease_order"] and isinstance(arg, (int, float)):
+                self._order = float(arg)
     
             self._animCounter = 0.0
             self._easeVals = np.array(())
@@ -104,13 +195,8 @@ class Animation:
             # make copies that will be animated
             self._animatedObjects = [o.copy() for o in self._targetObjects]
         
-        # calculate all easing deltas for each iteration of the animation
-        newEaseVals = []
-        for i in range(self._animationLength()):
-            newEaseVals.append(self._easeFun(i/(self._animationLength()))) # FIXME: the -1 issue for frame counting
-        self._easeVals = np.array(newEaseVals)
-        self._easeDeltas = np.diff(np.array(newEaseVals))
-        self._easeDeltas = np.concatenate((np.array((0.0,)), self._easeDeltas))
+        # look up all easing values and deltas for each iteration of the animation
+        self._easeVals, self._easeDeltas = _easeTable(self._easeFun, self._order, int(self._animationLength()))
 
         # reset the animation (iteration) counter
         self._animCounter = 0
@@ -120,6 +206,30 @@ class Animation:
 
         return self._animationLength() + 1
 
+    def updateHash(self, hasher):
+        """
+        Feeds the animation parameters and its objects into `hasher` (e.g. hashlib),
+        including all attributes set by subclasses (e.g. a direction or an offset)
+        """
+        hasher.update(repr((
+            self.__class__.__module__,
+            self.__class__.__name__,
+            self._animTime,
+            self._fps,
+            self._easeFun.name,
+            self._order)).encode())
+        for o in list(self._animatedObjects) + list(self._targetObjects):
+            o.updateHash(hasher)
+        for key in sorted(vars(self).keys()):
+            if key not in _ANIMATION_ATTRIBUTES:
+                hasher.update(key.encode())
+                _updateHashWith(hasher, vars(self)[key])
+
+    def setFps(self, fps):
+        """ Sets the frames per second at which the animation is stepped """
+        if isinstance(fps, (int, float)) and fps > 0:
+            self._fps = float(fps)
+
     def getAnimatedObjects(self):
         return self._animatedObjects
 
@@ -1,43 +1,89 @@
 from animlib.animations.animation import Animation
 
-class Transform(Animation):
+import numpy as np
 
-    def begin(self) -> int:
-        ret = super().begin()
+def _pathCenters(geometry):
+    """ Returns the center of the outline of each path (NaN for paths without points) """
+    pathBounds, _ = geometry._getBounds()
+    return np.mean(pathBounds, 1)
+
+def _pairPaths(centers, targetCenters):
+    """
+    Returns for each target path the index of the path it is morphed from:
+    paths are paired one-to-one by the proximity of their centers (closest
+    pairs first) and each remaining target path with its nearest path
+    """
+    if np.size(centers, 0) == 0:
+        raise Exception("cannot transform from or to a geometry without paths")
+    distances = np.linalg.norm(targetCenters.reshape((-1, 1, 2)) - centers.reshape((1, -1, 2)), axis=2)
+    distances[np.isnan(distances)] = np.inf
+    numTargets, num = np.shape(distances)
+
+    # pairing the closest pairs first is the same as repeatedly pairing all
+    # mutually nearest paths at once (ties go to the first paths, as `argmin`
+    # returns the first minimum) and dropping them from the distances
+    pairs = np.full(numTargets, -1)
+    targets, paths = np.arange(numTargets), np.arange(num)
+    remaining = distances
+    while np.size(targets) > 0 and np.size(paths) > 0:
+        nearest = np.argmin(remaining, 1)
+        isMutual = np.argmin(remaining, 0)[nearest] == np.arange(np.size(targets))
+        pairs[targets[isMutual]] = paths[nearest[isMutual]]
+        isPathLeft = np.ones(np.size(paths), dtype=bool)
+        isPathLeft[nearest[isMutual]] = False
+        targets, paths = targets[~isMutual], paths[isPathLeft]
+        remaining = remaining[~isMutual][:, isPathLeft]
+
+    isUnpaired = pairs < 0
+    pairs[isUnpaired] = np.argmin(distances[isUnpaired], 1)
+    return pairs
 
-        self._animatedPointDifferences = []
-        self._animatedFillColorDifferences = []
-        self._animatedStrokeColorDifferences = []
-        self._animatedStrokeWidthDifferences = []
+def _interpolate(start, difference, factor, out):
+    """ Writes `start + difference * factor` into `out` without allocating """
+    np.multiply(difference, factor, out=out)
+    np.add(out, start, out=out)
 
+class Transform(Animation):
+    """
+    Morphs each animated object into its target: their paths and points are
+    matched in `begin`, then each frame interpolates the points and styles
+    of all objects at once between the start and the target (rather than
+    accumulating changes)
+    """
 
-        if len(self._animatedObjects) > 1:
-            raise Exception("can only animate a single object")
+    def begin(self) -> int:
+        ret = super().begin()
 
         if len(self._animatedObjects) != len(self._targetObjects):
             raise Exception("can only animate matching number of objects")
         
-        
         for a, t in zip(self._animatedObjects, self._targetObjects):
-            if not a.pathsMatch(t):
-                while a.getNumPaths() < t.getNumPaths():
-                    a.duplicatePath()
-                while a.getNumPaths() > t.getNumPaths():
-                    t.duplicatePath()
-                
-            pointsOfPathsMatch = a.pointsOfPathsMatch(t)
-            if not all(pointsOfPathsMatch):
+            # the geometry with fewer paths duplicates its paths closest to the unpaired paths of the other
+            if a.getNumPaths() < t.getNumPaths():
+                a.selectPaths(_pairPaths(_pathCenters(a), _pathCenters(t)))
+            elif a.getNumPaths() > t.getNumPaths():
+                t.selectPaths(_pairPaths(_pathCenters(t), _pathCenters(a)))
+
+            # the path with fewer points splits its segments (the longer, the more often)
+            if not all(a.pointsOfPathsMatch(t)):
+                numPoints = [max(a.getNumPointsPerPath(p), t.getNumPointsPerPath(p)) for p in range(a.getNumPaths())]
+                a.resamplePaths(numPoints)
+                t.resamplePaths(numPoints)
 
-                for p in range(a.getNumPaths()): # == t.getNumPaths()
-                    while a.getNumPointsPerPath(p) < t.getNumPointsPerPath(p):
-                        a.interpolatePath(p)
-                    while a.getNumPointsPerPath(p) > t.getNumPointsPerPath(p):
-                        t.interpolatePath(p)
+        # stacks the points and styles of all objects, i.e. each frame is one operation for all
+        self._startPoints = np.concatenate([np.empty((0, 2))] + [a._paths.getPoints() for a in self._animatedObjects], 0)
+        self._endPoints = np.concatenate([np.empty((0, 2))] + [t._paths.getPoints() for t in self._targetObjects], 0)
+        self._pointDifferences = self._endPoints - self._startPoints
+        self._startStyles = np.stack([a.getStyle() for a in self._animatedObjects], 0)
+        self._endStyles = np.stack([t.getStyle() for t in self._targetObjects], 0)
+        self._styleDifferences = self._endStyles - self._startStyles
 
-            self._animatedPointDifferences += [t.getPoints() - a.getPoints()]
-            self._animatedFillColorDifferences += [t.getFillColor() - a.getFillColor()]
-            self._animatedStrokeColorDifferences += [t.getStrokeColor() - a.getStrokeColor()]
-            self._animatedStrokeWidthDifferences += [t.getStrokeWidth() - a.getStrokeWidth()]
+        # the animated objects keep their points and style in (views of) these
+        self._points = self._startPoints.copy()
+        self._styles = self._startStyles.copy()
+        offsets = np.cumsum([0] + [a.getNumPoints() for a in self._animatedObjects])
+        for i, a in enumerate(self._animatedObjects):
+            a.relocate(self._points[offsets[i]:offsets[i+1]], self._styles[i])
         
         return ret
 
@@ -46,27 +92,24 @@ class Transform(Animation):
             return False
         # if end is reached, clean up and return false
         if self._animCounter == self._animationLength():
+            # end exactly at the targets (`end + differences * 0`)
+            _interpolate(self._endPoints, self._pointDifferences, 0.0, self._points)
+            _interpolate(self._endStyles, self._styleDifferences, 0.0, self._styles)
+            [o.touch() for o in self._animatedObjects]
             self.finish()
         else:
             # animate
-            for i in range(len(self._animatedObjects)):
-                # print(self._animatedObjects[0]._fillColor)
-                # print(self._targetObjects[i].getFillColor() +
-                #     self._animatedFillColorDifferences[i] * self._easeVals[self._animCounter])
-                self._animatedObjects[i].translateBy(
-                    self._animatedPointDifferences[i] * self._easeDeltas[self._animCounter])
-                self._animatedObjects[i].setFill(
-                    self._animatedObjects[i].getFillColor() +
-                    self._animatedFillColorDifferences[i] * self._easeDeltas[self._animCounter])
-                self._animatedObjects[i].setStroke(
-                    color=
-                        self._animatedObjects[i].getStrokeColor() +
-                        self._animatedStrokeColorDifferences[i] * self._easeDeltas[self._animCounter],
-                    width=
-                        self._animatedObjects[i].getStrokeWidth() +
-                        self._animatedStrokeWidthDifferences[i] * self._easeDeltas[self._animCounter])
+            ease = self._easeVals[self._animCounter]
+            _interpolate(self._startPoints, self._pointDifferences, ease, self._points)
+            _interpolate(self._startStyles, self._styleDifferences, ease, self._styles)
+            [o.touch() for o in self._animatedObjects]
         self._animCounter += 1
         return True
 
+    def finish(self):
+        # the animated objects no longer share their points and styles with this animation
+        [o.release() for o in self._animatedObjects]
+        super().finish()
+
     def _directPointDifference(self, ele1, ele2):
         return ele2.getPoints() - ele1.getPoints()
\ No newline at end of file
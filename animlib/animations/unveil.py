@@ -1,10 +1,6 @@
 from animlib.animations.animation import Animation, AnimationOut
 from animlib.geometies.base import Base
 
-try:
-    import cairo
-except:
-    import cairocffi as cairo
 import numpy as np
 from enum import Enum
 
@@ -19,6 +15,12 @@ class UnveilDirections(Enum):
     BOTTOM_LEFT =   ( 1.0, -1.0,  1.0, -1.0)
 
 class Unveil(Animation):
+    """
+    Unveils objects by clipping them to a polygon whose edge sweeps across
+    them (see `UnveilDirections`). The polygon is one array shared by all
+    animated objects and updated once per frame
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -29,32 +31,47 @@ class Unveil(Animation):
             if key in ["unveilFrom", "unveil_from"]:
                 self._unveilFrom = arg if isinstance(arg, UnveilDirections) else UnveilDirections.LEFT
 
-        self._targetFillColors = []
-        self._targetStrokeColors = []
         self._outlines = []
+        self._clip = np.zeros((4, 2))
         
     def begin(self) -> int:
         ret = super().begin()
 
-        self._targetStrokeColors = [o.getStrokeColor() for o in self._targetObjects]
-        self._targetFillColors = [o.getFillColor() for o in self._targetObjects]
         self._outlines = [o.getOutline().reshape((1, 4)) for o in self._targetObjects]
         maxStrokeOffset = np.max(np.array([o.getStrokeWidth() for o in self._targetObjects])).squeeze() / 2.0
-        
-        self._unveilStartStop = np.concatenate((
-            np.min(np.concatenate(self._outlines, 0), 0)[:2],
-            np.max(np.concatenate(self._outlines, 0), 0)[2:]
-        ), 0)
+        outlines = np.concatenate(self._outlines, 0)
+        lower = np.nanmin(outlines[:, :2], 0) - maxStrokeOffset
+        upper = np.nanmax(outlines[:, 2:], 0) + maxStrokeOffset
 
-        self._unveilStartStop *= np.array(self._unveilFrom.value)
-        self._unveilStartStop += np.array(self._unveilFrom.value) * np.array((-1, -1, 1, 1)) * maxStrokeOffset
-        self._unveilStartStop = self._unveilStartStop.reshape((2, 2))
+        # the edge sweeps from the side the objects are unveiled from to the opposite side
+        direction = np.array(self._unveilFrom.value[:2])
+        self._unveilStartStop = np.stack((
+            np.where(direction > 0, lower, np.where(direction < 0, upper, 0.0)),
+            np.where(direction > 0, upper, np.where(direction < 0, lower, 0.0))), 0)
+        # long enough for the polygon to cover all objects on its side of the edge
+        self._clipSize = 2.0 * (np.max(np.abs(self._unveilStartStop)) + np.max(np.abs(np.stack((lower, upper))))) + 1.0
 
-        [o.setFill(opacity=0.0) for o in self._animatedObjects]
-        [o.setStroke(opacity=0.0) for o in self._animatedObjects]
+        self._updateClip(self._easeVals[0] if len(self._easeVals) > 0 else 0.0)
+        [o.setClip(self._clip) for o in self._animatedObjects]
 
         return ret
 
+    def _updateClip(self, ease):
+        """ Moves the edge of the clip polygon to `ease` (0 to 1) between the start and stop of the unveiling """
+        start, stop = self._unveilStartStop
+        axis = stop - start
+        edge = start + axis * ease
+        length = np.linalg.norm(axis)
+        axis = axis / length if length > 0 else np.array(self._unveilFrom.value[:2]) / np.linalg.norm(self._unveilFrom.value[:2])
+        normal = np.array((-axis[1], axis[0])) * self._clipSize
+        axis = axis * self._clipSize
+
+        # everything before the edge, i.e. on the side of `start`
+        self._clip[0] = edge + normal
+        self._clip[1] = edge - normal
+        self._clip[2] = edge - normal - axis
+        self._clip[3] = edge + normal - axis
+
     def next(self) -> bool:
 
         if self._animCounter > self._animationLength():
@@ -63,47 +80,8 @@ class Unveil(Animation):
         if self._animCounter == self._animationLength():
             self.finish()
         else:
-            for animatedObject, targetStrokeColor, targetFillColor in zip(self._animatedObjects, self._targetStrokeColors, self._targetFillColors):
-                linearStrokeGradient = cairo.LinearGradient(
-                    self._unveilStartStop[0, 0],
-                    self._unveilStartStop[0, 1],
-                    self._unveilStartStop[1, 0],
-                    self._unveilStartStop[1, 1])
-                linearStrokeGradient.add_color_stop_rgba(
-                    self._easeVals[self._animCounter],
-                    targetStrokeColor[0],
-                    targetStrokeColor[1],
-                    targetStrokeColor[2],
-                    targetStrokeColor[3]
-                )
-                linearStrokeGradient.add_color_stop_rgba(
-                    self._easeVals[self._animCounter],
-                    targetStrokeColor[0],
-                    targetStrokeColor[1],
-                    targetStrokeColor[2],
-                    0.0
-                )
-                animatedObject.setStroke(gradient=linearStrokeGradient)
-                linearFillGradient = cairo.LinearGradient(
-                    self._unveilStartStop[0, 0],
-                    self._unveilStartStop[0, 1],
-                    self._unveilStartStop[1, 0],
-                    self._unveilStartStop[1, 1])
-                linearFillGradient.add_color_stop_rgba(
-                    self._easeVals[self._animCounter],
-                    targetFillColor[0],
-                    targetFillColor[1],
-                    targetFillColor[2],
-                    targetFillColor[3]
-                )
-                linearFillGradient.add_color_stop_rgba(
-                    self._easeVals[self._animCounter],
-                    targetFillColor[0],
-                    targetFillColor[1],
-                    targetFillColor[2],
-                    0.0
-                )
-                animatedObject.setFill(gradient=linearFillGradient)
+            self._updateClip(self._easeVals[self._animCounter])
+            [o.setClip(self._clip) for o in self._animatedObjects]
 
         self._animCounter += 1
         return True
@@ -1,47 +1,275 @@
 from animlib.geometies.base import Base
 from animlib.animations.animation import Animation
+from animlib.utils.progress import Progress, TqdmProgress, CallbackProgress
+from animlib.utils.profiling import RenderProfiler
 
 try:
     import cairo
 except:
     import cairocffi as cairo
-import time, hashlib, subprocess, shutil
+import time, hashlib, subprocess, shutil, pickle, collections, os, tempfile
+import multiprocessing, threading, queue, atexit, weakref, traceback
+from multiprocessing import shared_memory
 import numpy as np
 from time import sleep
-from tqdm import tqdm
 
 LOCATION_TOP = np.array((0, 0)).reshape((-1, 2))
 LOCATION_BOTTOM = np.array((0, 0)).reshape((-1, 2))
 LOCATION_LEFT = np.array((0, 0)).reshape((-1, 2))
 LOCATION_RIGHT = np.array((0, 0)).reshape((-1, 2))
 
+# canvases whose movie is not closed yet, closed at exit if not closed before (see `Canvas.close`)
+_openCanvases = weakref.WeakSet()
+
+@atexit.register
+def _closeOpenCanvases():
+    [c.close() for c in list(_openCanvases)]
+
+def _setupContext(context, width, height, heightUnits, antialias=cairo.ANTIALIAS_DEFAULT):
+    """ Centers and scales `context` so that geometries are drawn in units """
+    context.set_antialias(antialias)
+
+    # center context axis
+    context.translate(width/2, height/2)
+
+    # re-scale context so that drawn geometies are always the same
+    # herein, -144 is the top and 144 is the bottom based on hightUnits
+    context.scale(height / heightUnits, height / heightUnits)
+
+def _paintSurface(context, surface, isBackground):
+    """ Paints a layer `surface` onto `context`, replacing the previous frame entirely if it is the background """
+    context.save()
+    context.identity_matrix()
+    context.set_source_surface(surface, 0, 0)
+    if isBackground:
+        context.set_operator(cairo.OPERATOR_SOURCE)
+    context.paint()
+    context.restore()
+
+def _sharedSurface(slot, width, height):
+    """ Returns a surface whose pixels are those of `slot` (a `SharedMemory`) """
+    stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_ARGB32, width)
+    return cairo.ImageSurface.create_for_data(slot.buf, cairo.FORMAT_ARGB32, width, height, stride)
+
+def _closeSharedSlots(slots):
+    """ Closes `slots` (a list of `SharedMemory`), once no surface uses them anymore """
+    for slot in slots:
+        try:
+            slot.close()
+        except BufferError:
+            # still exported (e.g. by a frame of `Canvas.frames`), i.e. unmapped once that is deleted
+            pass
+
+def _renderWorkerLoop(tasks, results, slotNames, width, height, heightUnits, antialias, backgroundColor):
+    """
+    Draws the frames sent by a `Canvas` into its shared surfaces (run by each
+    render worker process, see `Canvas._sendFrameToWorker`)
+    """
+    slots = [shared_memory.SharedMemory(name=name) for name in slotNames]
+    surfaces = [_sharedSurface(slot, width, height) for slot in slots]
+    contexts = [cairo.Context(s) for s in surfaces]
+    # the geometries below the animated ones are drawn once onto a layer (as in `Canvas._paintLayer`)
+    layer = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    layerContext = cairo.Context(layer)
+    [_setupContext(c, width, height, heightUnits, antialias) for c in contexts + [layerContext]]
+    # the geometries of the scene by key, which are kept (with their cached paths) until they change
+    geometries = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        frame, slot, changed, removed, background, order = task
+        try:
+            [geometries.pop(key) for key in removed]
+            changed, restyled = pickle.loads(changed)
+            geometries.update(changed)
+            [geometries[key].__setstate__(state) for key, state in restyled.items()]
+            if background is not None:
+                layerContext.set_source_rgba(
+                    backgroundColor[0],
+                    backgroundColor[1],
+                    backgroundColor[2],
+                    backgroundColor[3])
+                layerContext.paint()
+                [geometries[key].draw(layerContext) for key in background]
+                layer.flush()
+            _paintSurface(contexts[slot], layer, True)
+            [geometries[key].draw(contexts[slot]) for key in order]
+            surfaces[slot].flush()
+            results.put((frame, None))
+        except Exception:
+            results.put((frame, traceback.format_exc()))
+    del contexts, surfaces
+    _closeSharedSlots(slots)
+
+class _NullEncoder():
+    """ Stands in for the ffmpeg process when no movie is written """
+
+    def __init__(self):
+        self.stdin = open(os.devnull, "wb")
+
+    def wait(self):
+        return 0
+
+def _frameWriterLoop(frameQueue, freeSurfaces, surfaces, width, height, renderStats, profiler, errors):
+    """ Writes the frames queued by a `Canvas` into its movie pipe (run by its writer thread) """
+    while True:
+        item = frameQueue.get()
+        if item is None:
+            return
+        process, frame, repeat, profileFrame = item
+        start = time.perf_counter()
+        try:
+            if frame is None:
+                # the end of a segment
+                process.stdin.close()
+            elif len(errors) == 0:
+                [_writeSurface(process, surfaces[frame], width, height) for _ in range(repeat)]
+                renderStats["frames"] += repeat
+                if profiler is not None:
+                    profiler.record("write", time.perf_counter() - start, profileFrame)
+        except Exception as e:
+            # keep draining the queue, the error is raised in the main thread
+            errors.append(e)
+        if frame is not None:
+            freeSurfaces.put(frame)
+
+def _writeSurface(process, surface, width, height):
+    """ Writes the pixels of `surface` to the pipe without copying them """
+    data = memoryview(surface.get_data())
+    rowSize = 4 * width
+    stride = surface.get_stride()
+    if stride == rowSize:
+        process.stdin.write(data)
+    else:
+        # skip the padding at the end of each row
+        for row in range(height):
+            process.stdin.write(data[row*stride:row*stride + rowSize])
+
 class Canvas():
-    """ The `Canvas` enables drawing of multiple geometries (i.e. `Base`) """
+    """ The `Canvas` enables drawing of multiple geometries (i.e. `Base`)
 
-    def __init__(self, name, width=2560, height=1440, fps=60, movieFileExtension=".mp4"):
+        Passing `workers=N` (N > 1) rasterizes the frames of `animate` on N
+        worker processes. Each worker keeps the geometries of the scene, i.e.
+        only the geometries that changed since its last frame are sent to it,
+        and draws straight into surfaces in shared memory (`N` in addition to
+        those of `queueDepth`). The frames are still written to the movie
+        strictly in order.
+
+        Frames are handed to the movie pipe by a background writer thread.
+        `queueDepth` (an integer of at least 2) sets how many frames (i.e.
+        pre-allocated surfaces) can be queued for writing before drawing the
+        next frame waits for the pipe.
+
+        Passing `encoders=N` (N > 1) encodes each `animate` and `wait` call
+        into its own segment, with up to N ffmpeg processes encoding at the
+        same time. The segments are joined (without re-encoding) on close.
+
+        Passing `cacheDirectory` stores the encoded segments in that directory,
+        named by a hash of the scene, the animations and the canvas settings.
+        Unchanged segments are reused on the next run instead of being
+        rendered. The least recently used segments are deleted once the cache
+        exceeds `cacheSize` bytes.
+
+        Passing `preview=True` renders a draft: half the width and height,
+        half the frame rate, fast antialiasing and the fastest encoder preset.
+        Geometries keep their size relative to the frame and animations keep
+        their duration.
+
+        `progress` reports the progress of `animate` and `wait`. It can be a
+        `Progress` (e.g. `Progress()` to report nothing), a callback
+        `f(desc, n, total)` which is called at most every 0.1 seconds, or
+        `None` for a `tqdm` progress bar.
+
+        Passing `movieFileExtension=None` discards all frames instead of
+        encoding them, i.e. no ffmpeg is needed.
+
+        Passing `profile=True` records per frame timings (see `getProfiler`).
+
+        The movie is written by `close` (e.g. at the end of a `with` block),
+        or else when the canvas is deleted or Python exits.
+    """
+
+    def __init__(self, name, width=2560, height=1440, fps=60, movieFileExtension=".mp4", workers=0, queueDepth=2, encoders=1,
+            cacheDirectory=None, cacheSize=2**31, preview=False, progress=None, profile=False):
         if not isinstance(name, str):
             name = str(format(time.time()*1000))
             hasher = hashlib.sha256()
             hasher.update(name.encode())
             name = hasher.hexdigest()[:16]
         self._name = name
+        self._preview = preview if isinstance(preview, bool) else False
+        if self._preview:
+            # a quarter of the pixels at half the frame rate
+            width = int(width / 2) if isinstance(width, int) else width
+            height = int(height / 2) if isinstance(height, int) else height
+            fps = fps / 2 if isinstance(fps, (int, float)) else fps
+        self._antialias = cairo.ANTIALIAS_FAST if self._preview else cairo.ANTIALIAS_DEFAULT
         self._width = width if (isinstance(width, int) and width > 320) else 320
         self._height = height if (isinstance(height, int) and height > 240) else 240
         self._fps = fps if (isinstance(fps, (int, float)) and fps > 16) else 16
-        self._movieFileExtension = movieFileExtension if movieFileExtension in [".mp4", ".mov"] else ".mp4"
+        if movieFileExtension is None:
+            # no movie is written, i.e. all frames are discarded (e.g. for benchmarks)
+            self._movieFileExtension = None
+        else:
+            self._movieFileExtension = movieFileExtension if movieFileExtension in [".mp4", ".mov"] else ".mp4"
         self._geometrySet = []
         self._backgroundColor = np.array((0.0, 0.0, 0.0, 1.0))
+        self._workers = workers if (isinstance(workers, int) and workers > 1) else 0
+        self._workerProcesses = None
+        if not isinstance(queueDepth, int) or isinstance(queueDepth, bool) or queueDepth < 2:
+            raise ValueError("queueDepth must be an integer of at least 2, not {!r}".format(queueDepth))
+        self._queueDepth = queueDepth
+        self._encoders = encoders if (isinstance(encoders, int) and encoders > 1) else 1
+        self._cacheDirectory = cacheDirectory if isinstance(cacheDirectory, str) else None
+        self._cacheSize = cacheSize if isinstance(cacheSize, int) else 2**31
+        self._useSegments = (self._encoders > 1 or self._cacheDirectory is not None) and self._movieFileExtension is not None
+        if self._cacheDirectory is not None and not os.path.exists(self._cacheDirectory):
+            os.mkdir(self._cacheDirectory)
+        self._renderStats = {"frames": 0, "bytesCopied": 0, "cacheHits": 0, "cacheMisses": 0, "cacheEvictions": 0, "culled": 0}
+        # static geometries below/above the animated ones are cached as layers
+        self._animatedGeometries = set()
+        self._layers = {}
 
         # number of units upwards and downwards
         self._heightUnits = 288
 
-        self._progressBarStyle = "{desc:<8}{percentage:3.0f}%|{bar}|{n_fmt:3s}/{total_fmt:3s}[{elapsed}<{remaining},{rate_fmt}{postfix}]"
+        if isinstance(progress, Progress):
+            self._progress = progress
+        elif callable(progress):
+            self._progress = CallbackProgress(progress)
+        else:
+            self._progress = TqdmProgress()
+        self._profiler = RenderProfiler() if profile is True else None
 
         self._initCairo()
         self._openMoviePipe()
+        self._startFrameWriter()
+        _openCanvases.add(self)
     
     def __del__(self):
-        self._closeMoviePipe()
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Writes all queued frames and closes the movie, which is also done
+        when the canvas is deleted or at the latest when Python exits
+        """
+        _openCanvases.discard(self)
+        if not hasattr(self, "_writerThread"):
+            # `__init__` failed, i.e. there is nothing to close
+            return
+        try:
+            self._closeMoviePipe()
+        finally:
+            self._releaseSharedSlots()
+            self._discardSegments()
 
     def addGeometry(self, geometry, behind=None, toFront=None):
         """ Adds one or more geometries to the geometries which will be drawn """
@@ -85,19 +313,113 @@ class Canvas():
         """ Saves the presently drawn geometies into a png """
         name = name if name is not None else self._name
 
-        self._context.set_source_rgba(
-            self._backgroundColor[0],
-            self._backgroundColor[1],
-            self._backgroundColor[0],
-            self._backgroundColor[3])
-        self._context.paint()
-        [g.draw(self._context) for g in self._geometrySet]
+        # draw onto a surface which is not waiting to be written
+        slot = self._acquireSurface()
+        self._drawScene(self._context)
         self._surface.write_to_png(name + ".png")
+        self._freeSurfaces.put(slot)
+
+    def getProfiler(self):
+        """ Returns the `RenderProfiler` (only if created with `profile=True`) """
+        return self._profiler
+
+    def getRenderStats(self):
+        """ Returns counters about the frames written so far """
+        return dict(self._renderStats)
+
+    def getFrameSize(self):
+        """ Returns the number of bytes of the pixels of one frame (including the padding of the rows) """
+        return self._surface.get_stride() * self._height
 
     def animate(self, *animations):
         if any([not isinstance(a, Animation) for a in animations]):
             raise Exception("can only animate type Animation")
+
+        # animations must advance in steps of the canvas frames to keep their duration
+        [a.setFps(self._fps) for a in animations]
+
+        # the key must be computed before the animations change the scene
+        cacheKey = self._segmentKey("animate", *animations)
+        
+        animationDuration, tmpGeometries = self._beginAnimations(animations)
+
+        self._progress.begin("animate", animationDuration)
+        isCached = self._beginSegment(cacheKey)
+
+        if isCached:
+            # only step the animations to arrive at their final state
+            while any([a.next() for a in animations]):
+                self._progress.update(1)
+        elif self._workers > 0:
+            self._renderInWorkers(animations)
+        else:
+            while self._stepAnimations(animations):
+                self._progress.update(1)
+                self._writeFrame()
         
+        self._endSegment()
+        self._finishAnimations(tmpGeometries)
+        self._progress.end()
+
+    def frames(self, *animations):
+        """ Yields the frames of `animations` without encoding them
+
+            Each frame is a `height x width x 4` uint8 array (BGRA with
+            premultiplied alpha) which is a view of the canvas surface, i.e.
+            it is only valid until the next frame is requested. Without
+            animations, the present frame is yielded once.
+        """
+        if any([not isinstance(a, Animation) for a in animations]):
+            raise Exception("can only animate type Animation")
+
+        [a.setFps(self._fps) for a in animations]
+        _, tmpGeometries = self._beginAnimations(animations)
+        try:
+            isFirstFrame = True
+            while self._stepAnimations(animations) or (isFirstFrame and len(animations) == 0):
+                isFirstFrame = False
+                slot = self._acquireSurface()
+                try:
+                    self._drawScene(self._context)
+                    self._surface.flush()
+                    yield self._frameArray(self._surface)
+                finally:
+                    self._freeSurfaces.put(slot)
+        finally:
+            self._finishAnimations(tmpGeometries)
+
+    def wait(self, duration):
+        """ Holds the present frame for `duration` seconds """
+        duration = int(self._fps * duration)
+        if duration <= 0:
+            return
+
+        self._progress.begin("wait", duration)
+
+        # nothing changes, so the frame is drawn once and written repeatedly
+        if not self._beginSegment(self._segmentKey("wait", duration)):
+            if self._profiler is not None:
+                self._profiler.nextFrame()
+            self._writeFrame(repeat=duration)
+        self._endSegment()
+        self._progress.update(duration)
+        self._progress.end()
+
+    def _stepAnimations(self, animations):
+        """ Steps all animations and returns whether another frame follows """
+        if self._profiler is None:
+            return any([a.next() for a in animations])
+        self._profiler.nextFrame()
+        start = time.perf_counter()
+        hasNext = any([a.next() for a in animations])
+        self._profiler.record("animation", time.perf_counter() - start)
+        return hasNext
+
+    def _beginAnimations(self, animations):
+        """ Begins the animations and adds their objects to the scene
+
+            Returns the number of frames and the (temporarily) animated objects
+        """
         tmpGeometries, finalGeometries = [], []
         animationDuration = 0
         for animation in animations:
@@ -107,55 +429,95 @@ class Canvas():
             finalGeometries.append(animation.getTargetObjects())
         self.addGeometry(finalGeometries)
         self.addGeometry(tmpGeometries, behind=finalGeometries)
+        self._animatedGeometries = set(id(g) for objects in tmpGeometries for g in objects)
+        return animationDuration, tmpGeometries
 
-        # initialize the progress bar
-        progressBar = tqdm(
-            total=animationDuration,
-            desc="animate",
-            bar_format=self._progressBarStyle,
-            mininterval=0)
-
-        while any([a.next() for a in animations]):
-            progressBar.update(1)
-            self._writeFrame()
-        
+    def _finishAnimations(self, tmpGeometries):
+        """ Removes the animated objects from the scene """
         self.removeGeometry(tmpGeometries)
-        progressBar.close()
+        self._animatedGeometries = set()
+        self._layers = {}
 
-    def wait(self, duration):
-        duration = int(self._fps * duration)
-
-        for _ in tqdm(range(duration),
-            desc="wait",
-            bar_format=self._progressBarStyle,
-            mininterval=0):
-            self._writeFrame()
+    def _frameArray(self, surface):
+        """ Returns the pixels of `surface` as `height x width x 4` array (no copy) """
+        return np.ndarray(
+            shape=(self._height, self._width, 4),
+            dtype=np.uint8,
+            buffer=surface.get_data(),
+            strides=(surface.get_stride(), 4, 1))
 
     def _initCairo(self):
         global LOCATION_TOP, LOCATION_BOTTOM, LOCATION_LEFT, LOCATION_RIGHT
-        self._surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, self._width, self._height)
-        self._context = cairo.Context(self._surface)
-        self._context.set_antialias(cairo.ANTIALIAS_DEFAULT)
-
-        # center context axis
-        self._context.translate(self._width/2, self._height/2)
-
-        # re-scale context so that drawn geometies are always the same
-        # herein, -144 is the top and 144 is the bottom based on hightUnits
-        self._context.scale(self._height / self._heightUnits, self._height / self._heightUnits)
+        # the workers draw (one frame each at a time) into surfaces in shared memory
+        self._sharedSlots = []
+        if self._workers > 0:
+            stride = cairo.ImageSurface.format_stride_for_width(cairo.FORMAT_ARGB32, self._width)
+            self._sharedSlots = [shared_memory.SharedMemory(create=True, size=stride * self._height)
+                for _ in range(self._queueDepth + self._workers)]
+        self._initSurfaces()
 
         LOCATION_TOP[0,1] = -self._heightUnits/2
         LOCATION_BOTTOM[0,1] = self._heightUnits/2
         LOCATION_LEFT[0,0] = -self._heightUnits/2 * self._width/self._height
         LOCATION_RIGHT[0,0] = self._heightUnits/2 * self._width/self._height
 
+        # corners of the visible area (in the units of the geometries), see `_isVisible`
+        halfWidthUnits = self._heightUnits/2 * self._width/self._height
+        self._visibleOutline = np.array((
+            (-halfWidthUnits, -self._heightUnits/2),
+            (halfWidthUnits, self._heightUnits/2)))
+
+    def _initSurfaces(self):
+        """ Creates a ring of surfaces so that one can be drawn while others are written """
+        if len(self._sharedSlots) > 0:
+            self._surfaces = [_sharedSurface(slot, self._width, self._height) for slot in self._sharedSlots]
+        else:
+            self._surfaces = [cairo.ImageSurface(cairo.FORMAT_ARGB32, self._width, self._height)
+                for _ in range(self._queueDepth + self._workers)]
+        self._contexts = [cairo.Context(s) for s in self._surfaces]
+        [_setupContext(c, self._width, self._height, self._heightUnits, self._antialias) for c in self._contexts]
+        self._surface = self._surfaces[0]
+        self._context = self._contexts[0]
+
+    def _releaseSharedSlots(self):
+        """ Frees the shared memory of the surfaces (once the workers are gone), which are replaced by private ones """
+        if len(self._sharedSlots) == 0:
+            return
+        slots = self._sharedSlots
+        self._sharedSlots = []
+        self._initSurfaces()
+        _closeSharedSlots(slots)
+        [slot.unlink() for slot in slots]
+
     def _openMoviePipe(self):
-        """ Opens a movie pipe into which frame data can be written """
-        self._outputFilePath = self._name + self._movieFileExtension
-        self._tempFilePath = "_temp_" + self._outputFilePath
+        """ Prepares the movie pipe into which frame data can be written """
+        self._outputFilePath = self._name + (self._movieFileExtension or "")
+        self._tempFilePath = os.path.join(
+            os.path.dirname(self._outputFilePath),
+            "_temp_" + os.path.basename(self._outputFilePath))
+        # holds the segments and their list while they are encoded, see `_getSegmentDirectory`
+        self._segmentDirectory = None
+        self._segmentFilePaths = []
+        self._segmentsToCache = {}
+        self._cachedSegmentFilePaths = set()
+        self._encodingProcesses = collections.deque()
 
+        # ffmpeg is only started once the first frame is written (see
+        # `_queueFrame`) or, when encoding segments, for each segment
+        self.writing_process = None
+
+    def _openEncoder(self, filePath):
+        """ Starts an ffmpeg process that encodes raw frames into `filePath` """
+        if self._movieFileExtension is None:
+            return _NullEncoder()
+        command = self._encoderArguments() + [filePath]
+        return subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def _encoderArguments(self):
+        """ Returns the ffmpeg command (without output file) to encode raw frames """
         command = [
             "ffmpeg",
+            '-nostdin',  # the frames come from stdin, which is no keyboard input
             '-y',  # overwrite output file if it exists
             '-f', 'rawvideo',
             '-s', '%dx%d' % (self._width, self._height),  # size of one frame
@@ -177,33 +539,401 @@ class Canvas():
                 '-vcodec', 'libx264',
                 '-pix_fmt', 'yuv420p',
             ]
-        command += [self._tempFilePath]
-        self.writing_process = subprocess.Popen(command, stdin=subprocess.PIPE)
-        # self.writing_process.stdin.write(b" ")
-        
+            if self._preview:
+                command += ['-preset', 'ultrafast']
+        return command
+
+    def _segmentKey(self, *steps):
+        """ Returns a hash of the scene, the canvas settings and the `steps` to render """
+        if self._cacheDirectory is None:
+            return None
+        hasher = hashlib.sha256()
+        hasher.update(repr((
+            self._width,
+            self._height,
+            self._fps,
+            self._heightUnits,
+            tuple(self._backgroundColor),
+            self._encoderArguments())).encode())
+        for g in self._geometrySet:
+            g.updateHash(hasher)
+        for step in steps:
+            if isinstance(step, Animation):
+                step.updateHash(hasher)
+            else:
+                hasher.update(repr(step).encode())
+        return hasher.hexdigest()
+
+    def _beginSegment(self, cacheKey=None):
+        """ Opens the encoder of a new segment (only when encoding segments)
+
+            Returns `True` if the segment was found in the cache, i.e. no
+            frames must be rendered.
+        """
+        if not self._useSegments:
+            return False
+
+        if cacheKey is not None:
+            cacheFilePath = os.path.join(self._cacheDirectory, cacheKey + self._movieFileExtension)
+            if os.path.exists(cacheFilePath):
+                # mark as recently used for the eviction
+                os.utime(cacheFilePath)
+                self._segmentFilePaths.append(cacheFilePath)
+                self._cachedSegmentFilePaths.add(cacheFilePath)
+                self._renderStats["cacheHits"] += 1
+                return True
+            self._renderStats["cacheMisses"] += 1
+
+        filePath = os.path.join(self._getSegmentDirectory(),
+            "{:05d}{}".format(len(self._segmentFilePaths), self._movieFileExtension))
+        self._segmentFilePaths.append(filePath)
+        if cacheKey is not None:
+            self._segmentsToCache[filePath] = cacheFilePath
+        self.writing_process = self._openEncoder(filePath)
+        return False
+
+    def _getSegmentDirectory(self):
+        """ Returns the temporary directory of the segments, which is created next to the movie """
+        if self._segmentDirectory is None:
+            self._segmentDirectory = tempfile.mkdtemp(
+                prefix="_segments_", dir=os.path.dirname(os.path.abspath(self._outputFilePath)))
+        return self._segmentDirectory
+
+    def _discardSegments(self):
+        """ Forgets the segments and deletes their temporary directory, including anything left behind by an error """
+        self._segmentFilePaths = []
+        self._segmentsToCache = {}
+        self._cachedSegmentFilePaths = set()
+        if self._segmentDirectory is None:
+            return
+        shutil.rmtree(self._segmentDirectory, ignore_errors=True)
+        self._segmentDirectory = None
+
+    def _endSegment(self):
+        """ Lets the segment finish encoding while the next one is rendered """
+        if not self._useSegments or self.writing_process is None:
+            return
+        # the writer closes the pipe once all frames of the segment are written
+        self._frameQueue.put((self.writing_process, None, 0, None))
+        self._encodingProcesses.append(self.writing_process)
+        self.writing_process = None
+        # limit the number of concurrently running encoders
+        while len(self._encodingProcesses) >= self._encoders:
+            self._encodingProcesses.popleft().wait()
+
+    def _concatSegments(self):
+        """ Joins the encoded segments into the temporary movie file """
+        listFilePath = os.path.join(self._getSegmentDirectory(), "segments.txt")
+        with open(listFilePath, "w", encoding="utf-8") as listFile:
+            for filePath in self._segmentFilePaths:
+                listFile.write("file '{}'\n".format(os.path.abspath(filePath)))
+        subprocess.run([
+            "ffmpeg",
+            '-nostdin',  # never reads (i.e. waits for) keyboard input
+            '-y',
+            '-f', 'concat',
+            '-safe', '0',
+            '-i', listFilePath,
+            '-c', 'copy',
+            '-loglevel', 'error',
+            self._tempFilePath,
+        ], stdin=subprocess.DEVNULL, check=True)
+        for filePath in self._segmentFilePaths:
+            if filePath in self._segmentsToCache:
+                # keep newly rendered segments for the next run
+                os.replace(filePath, self._segmentsToCache[filePath])
+        self._discardSegments()
+        self._evictCachedSegments()
+
+    def _evictCachedSegments(self):
+        """ Deletes the least recently used segments until the cache fits `cacheSize` """
+        if self._cacheDirectory is None:
+            return
+        filePaths = [os.path.join(self._cacheDirectory, f) for f in os.listdir(self._cacheDirectory)]
+        filePaths = sorted([f for f in filePaths if os.path.isfile(f)], key=os.path.getmtime)
+        totalSize = sum([os.path.getsize(f) for f in filePaths])
+        for filePath in filePaths:
+            if totalSize <= self._cacheSize:
+                break
+            totalSize -= os.path.getsize(filePath)
+            os.remove(filePath)
+            self._renderStats["cacheEvictions"] += 1
 
     def _closeMoviePipe(self):
         """ Closes the movie pipe once frames have been written """
-        # closes the movie pipe
-        self.writing_process.stdin.close()
-        self.writing_process.wait()
+        # the workers must be gone before the pipe closes
+        self._closeWorkers()
+        # flush all queued frames
+        self._stopFrameWriter()
+        if self._useSegments:
+            # wait for all segments and join them
+            while len(self._encodingProcesses) > 0:
+                self._encodingProcesses.popleft().wait()
+            if len(self._segmentFilePaths) == 0:
+                return
+            self._concatSegments()
+        else:
+            if self.writing_process is None:
+                return
+            # closes the movie pipe
+            self.writing_process.stdin.close()
+            self.writing_process.wait()
+            self.writing_process = None
+            if self._movieFileExtension is None:
+                return
         # cleans up the generated files
         shutil.move(
             self._tempFilePath,
             self._outputFilePath
         )
         
-    def _writeFrame(self):
-        """ Writes the content of the cairo surface to the movie """
-        # draw background
-        # self._context.rectangle(-self._width/2, -self._height/2, self._width, self._height)
-        self._context.set_source_rgba(
+    def _writeFrame(self, repeat=1):
+        """ Draws a frame and queues it to be written `repeat` times to the movie """
+        slot = self._acquireSurface()
+        self._drawScene(self._context)
+        self._surface.flush()
+        self._queueFrame(slot, repeat)
+
+    def _isVisible(self, geometry):
+        """ Returns False if `geometry` is hidden or its outline (plus stroke) is outside the visible area """
+        if geometry._isHidden:
+            return False
+        if geometry.getNumPaths() == 0:
+            return True
+        outline = geometry.getOutline()
+        padding = geometry._getStrokePadding()
+        # NB: NaN outlines (i.e. paths without points) are never culled
+        isCulled = np.any(outline[1, :] + padding < self._visibleOutline[0, :]) \
+            or np.any(outline[0, :] - padding > self._visibleOutline[1, :])
+        if isCulled:
+            self._renderStats["culled"] += 1
+        return not isCulled
+
+    def _drawGeometries(self, context, geometries):
+        """ Draws the visible `geometries` onto `context`, timing each class when profiling """
+        geometries = [g for g in geometries if self._isVisible(g)]
+        if self._profiler is None:
+            [g.draw(context) for g in geometries]
+            return
+        for g in geometries:
+            start = time.perf_counter()
+            g.draw(context)
+            self._profiler.record("draw:" + g.__class__.__name__, time.perf_counter() - start)
+
+    def _paintBackground(self, context):
+        """ Fills `context` with the background color """
+        context.set_source_rgba(
             self._backgroundColor[0],
             self._backgroundColor[1],
             self._backgroundColor[2],
             self._backgroundColor[3])
-        # self._context.fill()
-        self._context.paint()
-        [g.draw(self._context) for g in self._geometrySet]
-        frame = self._surface.get_data()
-        self.writing_process.stdin.write(frame.tobytes())
\ No newline at end of file
+        context.paint()
+
+    def _drawScene(self, context):
+        """ Draws the background and all geometries onto `context` """
+        indices = [i for i, g in enumerate(self._geometrySet) if id(g) in self._animatedGeometries]
+        if len(indices) == 0:
+            start = time.perf_counter()
+            self._paintBackground(context)
+            if self._profiler is not None:
+                self._profiler.record("background", time.perf_counter() - start)
+            self._drawGeometries(context, self._geometrySet)
+            return
+
+        # only the geometries from the lowest to the highest animated one are redrawn
+        first, last = indices[0], indices[-1] + 1
+        self._paintLayer(context, "background", self._geometrySet[:first])
+        self._drawGeometries(context, self._geometrySet[first:last])
+        self._paintLayer(context, "foreground", self._geometrySet[last:])
+
+    def _paintLayer(self, context, name, geometries):
+        """ Paints a layer of static geometries, which is only redrawn if one of them changed """
+        isBackground = name == "background"
+        if not isBackground and len(geometries) == 0:
+            return
+
+        key = tuple((id(g), g.getRevision()) for g in geometries)
+        if isBackground:
+            key += tuple(self._backgroundColor)
+
+        layer = self._layers.get(name, None)
+        if layer is None or layer[0] != key:
+            surface = layer[1] if layer is not None else cairo.ImageSurface(
+                cairo.FORMAT_ARGB32, self._width, self._height)
+            layerContext = cairo.Context(surface)
+            _setupContext(layerContext, self._width, self._height, self._heightUnits, self._antialias)
+            if isBackground:
+                self._paintBackground(layerContext)
+            else:
+                layerContext.set_operator(cairo.OPERATOR_CLEAR)
+                layerContext.paint()
+                layerContext.set_operator(cairo.OPERATOR_OVER)
+            self._drawGeometries(layerContext, geometries)
+            surface.flush()
+            layer = (key, surface)
+            self._layers[name] = layer
+
+        start = time.perf_counter()
+        _paintSurface(context, layer[1], isBackground)
+        if self._profiler is not None:
+            self._profiler.record("background", time.perf_counter() - start)
+
+    def _acquireSurface(self):
+        """ Waits for a surface that is not queued and makes it the current one """
+        self._raiseWriterError()
+        start = time.perf_counter()
+        slot = self._freeSurfaces.get()
+        if self._profiler is not None:
+            self._profiler.record("queue", time.perf_counter() - start)
+        self._surface = self._surfaces[slot]
+        self._context = self._contexts[slot]
+        return slot
+
+    def _queueFrame(self, frame, repeat=1):
+        """ Queues a frame (i.e. the slot of its surface) for the writer thread """
+        self._raiseWriterError()
+        if self.writing_process is None:
+            self.writing_process = self._openEncoder(self._tempFilePath)
+        profileFrame = self._profiler.getFrame() if self._profiler is not None else None
+        # blocks while the queue is full, i.e. applies backpressure
+        start = time.perf_counter()
+        self._frameQueue.put((self.writing_process, frame, repeat, profileFrame))
+        if self._profiler is not None:
+            self._profiler.record("queue", time.perf_counter() - start)
+
+    def _startFrameWriter(self):
+        """ Starts the thread that writes queued frames into the movie pipe """
+        self._freeSurfaces = queue.Queue()
+        [self._freeSurfaces.put(slot) for slot in range(len(self._surfaces))]
+        self._frameQueue = queue.Queue(maxsize=self._queueDepth)
+        # NB: the first error of the writer thread (a list, as the thread must not reference the canvas)
+        self._writerErrors = []
+        # the thread gets no reference to the canvas, which would keep it from being deleted (and closed)
+        self._writerThread = threading.Thread(target=_frameWriterLoop, daemon=True, args=(
+            self._frameQueue, self._freeSurfaces, self._surfaces, self._width, self._height,
+            self._renderStats, self._profiler, self._writerErrors))
+        self._writerThread.start()
+
+    def _stopFrameWriter(self):
+        """ Writes all queued frames and stops the writer thread """
+        if self._writerThread is None:
+            return
+        self._frameQueue.put(None)
+        self._writerThread.join()
+        self._writerThread = None
+        self._raiseWriterError()
+
+    def _raiseWriterError(self):
+        if len(self._writerErrors) > 0:
+            raise Exception("writing to the movie pipe failed: {}".format(self._writerErrors[0]))
+
+    def _openWorkers(self):
+        """ Starts the render worker processes if they are not running yet """
+        if self._workerProcesses is not None:
+            return
+        # spawn (rather than fork) so that workers do not inherit the movie pipe
+        context = multiprocessing.get_context("spawn")
+        self._workerTasks = [context.SimpleQueue() for _ in range(self._workers)]
+        self._workerResults = context.Queue()
+        # per worker, the geometries it keeps by id, as (geometry, revision, revision of the points),
+        # and the key of its background layer
+        self._workerGeometries = [{} for _ in range(self._workers)]
+        self._workerBackgrounds = [None] * self._workers
+        self._workerProcesses = [context.Process(target=_renderWorkerLoop, daemon=True, args=(
+            tasks, self._workerResults, [slot.name for slot in self._sharedSlots],
+            self._width, self._height, self._heightUnits, self._antialias, tuple(self._backgroundColor)))
+            for tasks in self._workerTasks]
+        [p.start() for p in self._workerProcesses]
+
+    def _closeWorkers(self):
+        """ Stops the render worker processes """
+        if self._workerProcesses is None:
+            return
+        [tasks.put(None) for tasks in self._workerTasks]
+        [p.join() for p in self._workerProcesses]
+        self._workerProcesses = None
+        self._workerTasks = None
+        self._workerResults = None
+        self._workerGeometries = None
+        self._workerBackgrounds = None
+
+    def _renderInWorkers(self, animations):
+        """ Steps the animations and lets the workers rasterize the frames """
+        self._openWorkers()
+        # (frame, slot) of the frames being drawn, in order, and the frames drawn out of order
+        pendingFrames = collections.deque()
+        doneFrames = set()
+        frame = 0
+        while self._stepAnimations(animations):
+            if len(pendingFrames) >= self._workers:
+                # NB: there is one shared surface per worker (besides those queued for writing)
+                self._queueWorkerFrame(pendingFrames.popleft(), doneFrames)
+            slot = self._acquireSurface()
+            start = time.perf_counter()
+            self._sendFrameToWorker(frame % self._workers, frame, slot)
+            if self._profiler is not None:
+                self._profiler.record("copy", time.perf_counter() - start)
+            pendingFrames.append((frame, slot))
+            frame += 1
+        while len(pendingFrames) > 0:
+            self._queueWorkerFrame(pendingFrames.popleft(), doneFrames)
+
+    def _sendFrameToWorker(self, worker, frame, slot):
+        """
+        Sends the visible geometries which changed since the last frame of
+        `worker` (pickled immediately, i.e. before the next step changes them),
+        without their points if only those did not change, and which of them
+        to draw onto its background layer and the frame
+        """
+        keptGeometries = self._workerGeometries[worker]
+        scene = set(id(g) for g in self._geometrySet)
+        removed = [key for key in keptGeometries if key not in scene]
+        [keptGeometries.pop(key) for key in removed]
+        changed, restyled = {}, {}
+        geometries = [g for g in self._geometrySet if self._isVisible(g)]
+        for g in geometries:
+            key = id(g)
+            kept = keptGeometries.get(key, None)
+            if kept is not None and kept[1] == g.getRevision():
+                continue
+            if kept is not None and kept[2] == g._packedPaths.getRevision():
+                # e.g. the style or clip changed, i.e. the worker keeps the cached path
+                restyled[key] = g._getStateWithoutPoints()
+            else:
+                changed[key] = g
+            # keeps a reference, i.e. the id is not reused by another geometry
+            keptGeometries[key] = (g, g.getRevision(), g._packedPaths.getRevision())
+
+        # only the geometries from the lowest animated one upwards are drawn for each frame
+        animated = [i for i, g in enumerate(geometries) if id(g) in self._animatedGeometries]
+        first = animated[0] if len(animated) > 0 else len(geometries)
+        background = [id(g) for g in geometries[:first]]
+        backgroundKey = tuple((key, keptGeometries[key][1]) for key in background)
+        if backgroundKey == self._workerBackgrounds[worker]:
+            # the layer of the worker is up to date
+            background = None
+        self._workerBackgrounds[worker] = backgroundKey
+        self._workerTasks[worker].put((frame, slot, pickle.dumps((changed, restyled), pickle.HIGHEST_PROTOCOL),
+            removed, background, [id(g) for g in geometries[first:]]))
+
+    def _queueWorkerFrame(self, pendingFrame, doneFrames):
+        """ Waits for a frame drawn by a worker and queues it for writing """
+        frame, slot = pendingFrame
+        start = time.perf_counter()
+        while frame not in doneFrames:
+            try:
+                doneFrame, error = self._workerResults.get(timeout=1.0)
+            except queue.Empty:
+                if not all([p.is_alive() for p in self._workerProcesses]):
+                    raise Exception("a render worker stopped unexpectedly")
+                continue
+            if error is not None:
+                raise Exception("rendering frame {} failed in a worker:\n{}".format(doneFrame, error))
+            doneFrames.add(doneFrame)
+        doneFrames.discard(frame)
+        if self._profiler is not None:
+            self._profiler.record("copy", time.perf_counter() - start)
+        # the pixels were drawn by another process
+        self._surfaces[slot].mark_dirty()
+        self._queueFrame(slot)
+        self._progress.update(1)
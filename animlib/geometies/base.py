@@ -4,11 +4,36 @@ try:
 except:
     import cairocffi as cairo
 from enum import Enum
-import copy
+import copy, itertools, functools, math
 
-from animlib.utils.points import convertToPoints, sliceBezier
+from animlib.utils.points import convertToPoints, sliceBezier, resampleBeziers
+from animlib.utils.paths import PackedPaths
 from animlib.utils.colors import convertToColor, ColorComponent
 
+# revisions are unique across all geometries, see `Base.getRevision`
+_revisions = itertools.count()
+
+# fill color (RGBA), stroke color (RGBA) and stroke width, see `Base._style`
+_FILL = slice(0, 4)
+_STROKE = slice(4, 8)
+_WIDTH = 8
+_DEFAULT_STYLE = np.array((1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.10))
+
+# cairo stores paths in device space with 1/256 pixel precision, i.e. a cached
+# path may be replayed at up to this times the scale it was built at (see `draw`)
+_PATH_SCALE_TOLERANCE = 2.0
+
+def _randomInteger(high, rng=None):
+    """ Draws an integer below `high` from `rng` (a `np.random.Generator` or seed), or from NumPy's global random state """
+    if rng is None:
+        return np.random.randint(high)
+    return int(np.random.default_rng(rng).integers(high))
+
+@functools.lru_cache(maxsize=None)
+def _slotNames(cls):
+    """ Returns the names of the `__slots__` of `cls` and its base classes """
+    return tuple(key for c in cls.__mro__ for key in c.__dict__.get("__slots__", ()))
+
 class Center(Enum):
     BY_POINTS = 0
     BY_OUTLINE = 1
@@ -25,19 +50,36 @@ class Direction(Enum):
 
 class Base():
     """
-    Defines the basic geometry using points, stroke and fill information
+    Defines the basic geometry using points, stroke and fill information.\n
+    Uses `__slots__` and keeps the fill color, stroke color and stroke width
+    in one float array (`_style`) to stay small in scenes with many shapes.
+    Subclasses without `__slots__` (e.g. `SVG`) get a `__dict__` as usual.
     """
 
+    __slots__ = (
+        "_revision", "_boundsCache", "_cairoPathCache",
+        "_packedPaths", "_matrix",
+        "_style", "_fillGradient", "_strokeGradient", "_clip", "_isHidden")
+
+    # attributes of the points and of what is cached about them, see `_getStateWithoutPoints`
+    _POINT_ATTRIBUTES = ("_packedPaths", "_boundsCache", "_cairoPathCache")
+
     def __init__(self, *args, **kwargs):
         assert len(args)==0, "for Base objects, each argument must be named"
 
-        self.clearPoints()
-        self._paths = []
+        self._revision = next(_revisions)
+        # outlines of the paths and the geometry, see `_getBounds`
+        self._boundsCache = None
+        # cairo path of the untransformed points, see `draw`
+        self._cairoPathCache = None
+        self._packedPaths = PackedPaths()
+        # deferred affine transform of the points (`3 x 3`), None if there is none
+        self._matrix = None
+        self._style = _DEFAULT_STYLE.copy()
         self._fillGradient = None
-        self._fillColor = np.array((1.0, 1.0, 1.0, 1.0))
         self._strokeGradient = None
-        self._strokeColor = np.array((1.0, 1.0, 1.0, 1.0))
-        self._strokeWidth = 0.10
+        # polygon (`n x 2`) outside of which nothing is drawn, see `setClip`
+        self._clip = None
         self._isHidden = False
 
         for key in kwargs:
@@ -59,33 +101,165 @@ class Base():
             "H" if self._isHidden else "V",
             id(self))
     
+    def _getAttributes(self):
+        """ Returns all attributes that are set, i.e. of `__slots__` and `__dict__` """
+        attributes = {}
+        for key in _slotNames(self.__class__):
+            try:
+                attributes[key] = getattr(self, key)
+            except AttributeError:
+                pass
+        attributes.update(getattr(self, "__dict__", {}))
+        return attributes
+
+    def __getstate__(self):
+        """ Replaces cairo gradients (which cannot be pickled) by their stops and drops the cairo path """
+        state = self._getAttributes()
+        state["_cairoPathCache"] = None
+        for key in ["_fillGradient", "_strokeGradient"]:
+            if isinstance(state[key], cairo.LinearGradient):
+                state[key] = (
+                    state[key].get_linear_points(),
+                    state[key].get_color_stops_rgba())
+        return state
+
+    def __setstate__(self, state):
+        """ Re-creates the cairo gradients stored by `__getstate__` """
+        for key in ["_fillGradient", "_strokeGradient"]:
+            if isinstance(state[key], tuple):
+                points, stops = state[key]
+                state[key] = cairo.LinearGradient(*points)
+                [state[key].add_color_stop_rgba(*stop) for stop in stops]
+        [setattr(self, key, value) for key, value in state.items()]
+
+    def _getStateWithoutPoints(self):
+        """
+        Returns the state (see `__getstate__`) without the points, e.g. to
+        update a copy (passed to `__setstate__`) whose points did not change
+        while keeping its cached paths
+        """
+        state = self.__getstate__()
+        [state.pop(key, None) for key in self._POINT_ATTRIBUTES]
+        return state
+
     def copy(self):
-        """ Returns a copy (i.e. deep copy) of the object """
-        return copy.deepcopy(self)
+        """
+        Returns a copy of the object, which shares its points with the
+        original until either is modified (much faster than a deep copy)
+        """
+        result = self.__class__.__new__(self.__class__)
+        for key, value in self._getAttributes().items():
+            if isinstance(value, PackedPaths):
+                value = value.copy()
+            elif isinstance(value, (np.ndarray, list, dict, set)):
+                # e.g. colors, outlines and per-class bookkeeping
+                value = copy.copy(value)
+            # everything else (numbers, gradients, the cairo path) is immutable or replaced, not edited
+            setattr(result, key, value)
+        result._touch()
+        return result
+
+    def updateHash(self, hasher):
+        """ Feeds everything that affects how the geometry is drawn into `hasher` (e.g. hashlib) """
+        hasher.update(self.__class__.__name__.encode())
+        hasher.update(self._packedPaths.getOffsets().tobytes())
+        if self.getNumPaths() > 0:
+            hasher.update(np.ascontiguousarray(self._packedPaths.getPoints(), dtype=float).tobytes())
+        if self._matrix is not None:
+            hasher.update(self._matrix.tobytes())
+        hasher.update(self._style.tobytes())
+        hasher.update(repr(self._isHidden).encode())
+        if self._clip is not None:
+            hasher.update(np.ascontiguousarray(self._clip, dtype=float).tobytes())
+        for gradient in [self._fillGradient, self._strokeGradient]:
+            if isinstance(gradient, cairo.LinearGradient):
+                hasher.update(repr((gradient.get_linear_points(), gradient.get_color_stops_rgba())).encode())
+
+    @property
+    def _paths(self):
+        """ The packed paths, after applying the deferred transform to their points """
+        self._applyMatrix()
+        return self._packedPaths
+
+    def _applyMatrix(self):
+        """ Bakes the deferred transform (see `_transformBy`) into the points """
+        self._materialize()
+        if self._matrix is None:
+            return
+        cachedBounds = self._cachedBounds()
+        self._packedPaths.setPoints(self._transformPoints(self._packedPaths.getPoints()))
+        self._matrix = None
+        if cachedBounds is not None:
+            self._keepBounds(*cachedBounds)
+
+    def _materialize(self):
+        """ Stores all paths in `_packedPaths`, for subclasses that defer some of them (see `SVG`) """
+        pass
+
+    def _transformPoints(self, points):
+        """ Returns `points` (`n x 2`) after applying the deferred transform """
+        if self._matrix is None:
+            return points
+        return points.dot(self._matrix[:2, :2].T) + self._matrix[:2, 2]
+
+    def _transformBy(self, matrix):
+        """
+        Applies an affine transform (`3 x 3`) after the present one, which
+        is deferred until the points are read or the geometry is drawn
+        """
+        self._matrix = matrix if self._matrix is None else matrix.dot(self._matrix)
+        self._boundsCache = None
+        if abs(np.linalg.det(self._matrix[:2, :2])) < 1e-12:
+            # cairo cannot draw with a singular matrix
+            self._applyMatrix()
+        self._touch()
+
+    def getRevision(self) -> int:
+        """ Returns a number that changes whenever the geometry is modified """
+        return self._revision
+
+    def _touch(self):
+        """ Marks the geometry as modified (e.g. to invalidate cached drawings) """
+        self._revision = next(_revisions)
 
     def hide(self, isHidden=True):
         """ Hides the geometry from being drawn """
         self._isHidden = isHidden if isinstance(isHidden, bool) else True
+        self._touch()
+
+    def setClip(self, clip=None):
+        """
+        Draws only inside the polygon `clip` (`n x 2`), or everywhere if None.\n
+        The polygon is kept, not copied, i.e. may be shared by many geometries
+        and updated in place, followed by calling `setClip` again (see `Unveil`)
+        """
+        self._clip = clip
+        self._touch()
 
     def show(self, isShown=True):
         """ Shows the geometry when being drawn """
         self._isHidden = not isShown if isinstance(isShown, bool) else False
+        self._touch()
 
     def addPoint(self, point):
         """ Adds one ore more points """
         if isinstance(point, (list, tuple)):
             [self.addPoint(p) for p in point]
+            return
         elif isinstance(point, str):
             point = convertToPoints(point)
         elif not isinstance(point, np.ndarray) and np.size(point, 1) != 2:
             return
-        assert len(self._paths) > 0, "Object has no path"
-        self._paths[-1] = np.concatenate((self._paths[-1], point), 0)
+        assert len(self._packedPaths) > 0, "Object has no path"
+        self._paths.extend(point)
+        self._touch()
 
-    def duplicatePath(self, idx=None):
+    def duplicatePath(self, idx=None, rng=None):
+        """ Duplicates the path at `idx`, or a random one (drawn from `rng`, e.g. a seed, if passed) """
         if not isinstance(idx, int):
-            idx = np.random.randint(len(self._paths))   
-        self._paths.insert(idx, np.array(self._paths[idx]))
+            idx = _randomInteger(self.getNumPaths(), rng)
+        self._paths.insert(idx, self._paths[idx])
+        self._touch()
 
     def pathsMatch(self, target):
         if not isinstance(target, Base):
@@ -100,34 +274,67 @@ class Base():
             r += [np.size(p1, 0) == np.size(p2, 0)]
         return r
 
-    def interpolatePath(self, p):
-        """ Interpolates the points at path p by an additional 3 bezier anchors """
+    def interpolatePath(self, p, rng=None):
+        """
+        Interpolates the points at path p by an additional 3 bezier anchors,
+        splitting a random segment (drawn from `rng`, e.g. a seed, if passed)
+        """
         path = self._paths[p]
-        at = np.random.randint(int((np.size(path, 0)-1)/3)) * 3 + 1
+        at = _randomInteger(int((np.size(path, 0)-1)/3), rng) * 3 + 1
         points = path[at-1:at+3, :]
 
         self._paths[p] = np.concatenate((
             path[:at-1, :],
             sliceBezier(points),
             path[at+3:, :]), 0)
+        self._touch()
+
+    def selectPaths(self, indices):
+        """ Replaces the paths by those at `indices` (e.g. to reorder or duplicate paths) in one pass """
+        paths = self._paths
+        offsets = paths.getOffsets()
+        indices = np.asarray(indices, dtype=int).reshape((-1,))
+        numPoints = np.diff(offsets)[indices]
+        # index of each new point into the present points
+        firstPoints = np.repeat(offsets[indices] - (np.cumsum(numPoints) - numPoints), numPoints)
+        self._packedPaths = PackedPaths()
+        self._packedPaths.appendPaths(paths.getPoints()[firstPoints + np.arange(np.sum(numPoints))], numPoints)
+        self._touch()
+
+    def resamplePaths(self, numPointsPerPath):
+        """
+        Splits the bezier segments of each path until it has as many points
+        as given by `numPointsPerPath`, without changing its shape
+        """
+        paths = self._paths
+        numPointsPerPath = [int(n) for n in numPointsPerPath]
+        if len(numPointsPerPath) != len(paths):
+            raise Exception("must pass the number of points for each path")
+        if all([paths.getNumPointsOfPath(p) == n for p, n in enumerate(numPointsPerPath)]):
+            return
+        points = [resampleBeziers(path, n) for path, n in zip(paths, numPointsPerPath)]
+        self._packedPaths = PackedPaths()
+        self._packedPaths.appendPaths(np.concatenate(points, 0), numPointsPerPath)
+        self._touch()
 
     def getNumPoints(self) -> int:
-        return int(np.size(self.getPoints(), 0))
+        return self._packedPaths.getNumPoints()
 
     def getNumPointsPerPath(self, p) -> int:
-        return np.size(self._paths[p], 0)
+        self._materialize()
+        return self._packedPaths.getNumPointsOfPath(p)
 
     def getNumPaths(self) -> int:
-        return len(self._paths)
+        return len(self._packedPaths)
 
     def getNthPoint(self, n) -> np.ndarray:
         """ Returns the Nth point """
-        allPoints = self.getPoints()
+        allPoints = self._paths.getPoints()
         if not isinstance(n, int):
             raise Exception("n must be an integer")
         if np.size(allPoints, 0) == 0:
             return None
-        return allPoints[n, :].reshape((1, 2))
+        return allPoints[n, :].reshape((1, 2)).copy()
 
     # def getFirstPoint(self) -> np.ndarray:
     #     """ Returns the first added point """
@@ -148,8 +355,8 @@ class Base():
     #     return self.getPoints()[-2, :].reshape((1, 2))
 
     def getPoints(self) -> np.ndarray:
-        """ Returns all points """
-        return np.concatenate(self._paths, 0)
+        """ Returns a copy of all points """
+        return self._paths.getPoints().copy()
 
     def setStroke(self, color=None, component=None, opacity=None, width=None, gradient=None):
         """ Sets stroke properties regarding color, opacity and width """
@@ -160,12 +367,12 @@ class Base():
                 # ... get the 4d color vector and assign
                 strokeColor = convertToColor(color) 
                 if strokeColor is not None and isinstance(strokeColor, np.ndarray):
-                    self._strokeColor = strokeColor
+                    self._style[4:4+np.size(strokeColor)] = strokeColor
 
             # if RGBA component is specified and the color is correct format ...
             elif isinstance(component, ColorComponent) and isinstance(strokeColor, (int, float)): 
                 # ... assign color component directly
-                self._strokeColor[component.value] = float(strokeColor)
+                self._style[_STROKE][component.value] = float(strokeColor)
 
             self._strokeGradient = None
 
@@ -175,20 +382,53 @@ class Base():
 
         # specify opacity, i.e. alpha value
         elif opacity is not None and isinstance(opacity, (float, int)):
-            self._strokeColor[3] = float(opacity)
+            self._style[_STROKE][3] = float(opacity)
 
         # specify stroke width
         if width is not None and isinstance(width, (float, int)):
-            self._strokeWidth = float(width)
+            self._style[_WIDTH] = float(width)
+
+        self._touch()
 
     def getStrokeColor(self, component=None):
         if component is None:
-            return self._strokeColor
+            return self._style[_STROKE].copy()
         elif isinstance(component, ColorComponent):
-            return self._strokeColor[component.value]
+            return self._style[_STROKE][component.value]
 
     def getStrokeWidth(self):
-        return self._strokeWidth
+        return float(self._style[_WIDTH])
+
+    def getStyle(self) -> np.ndarray:
+        """ Returns the fill color (RGBA), stroke color (RGBA) and stroke width as one array """
+        return self._style.copy()
+
+    def relocate(self, points, style):
+        """
+        Moves the points (`N x 2`) and style (see `getStyle`) into the
+        writable arrays `points` and `style`, e.g. views of arrays shared by
+        many geometries and updated at once (see `Transform`). Call
+        `touch` after writing into them
+        """
+        self._applyMatrix()
+        self._packedPaths.relocate(points)
+        style[:] = self._style
+        self._style = style
+        self._touch()
+
+    def release(self):
+        """ Moves the points and style out of the arrays passed to `relocate` into arrays of their own """
+        self._packedPaths.release()
+        self._style = self._style.copy()
+
+    def touch(self):
+        """ Marks the points and style as modified, e.g. after writing into the arrays passed to `relocate` """
+        self._packedPaths.touch()
+        self._touch()
+
+    def _getStrokePadding(self):
+        """ Returns how far the stroke reaches beyond the outline """
+        return float(self._style[_WIDTH]) / 2
 
     def setFill(self, color=None, component=None, opacity=None, gradient=None):
         """ Sets fill properties regarding color and opacity """
@@ -200,12 +440,12 @@ class Base():
                 # ... get the 4d color vector and assign
                 fillColor = convertToColor(color)
                 if fillColor is not None and isinstance(fillColor, np.ndarray):
-                    self._fillColor = fillColor
+                    self._style[0:np.size(fillColor)] = fillColor
             
             # if RGBA component is specified and color is correct format ...
             elif isinstance(component, ColorComponent) and isinstance(fillColor, (int, float)):
                 # ... assign color component directly
-                self._fillColor[component.value] = float(fillColor)
+                self._style[_FILL][component.value] = float(fillColor)
             
             self._fillGradient = None
         
@@ -215,19 +455,22 @@ class Base():
 
         # specify opacity, i.e. alpha value
         elif opacity is not None and isinstance(opacity, (float, int)):
-            self._fillColor[3] = float(opacity)
-        
+            self._style[_FILL][3] = float(opacity)
+
+        self._touch()
 
     def getFillColor(self, component=None):
         if component is None:
-            return self._fillColor
+            return self._style[_FILL].copy()
         elif isinstance(component, ColorComponent):
-            return self._fillColor[component.value]
+            return self._style[_FILL][component.value]
 
     def clearPoints(self):
         """ Deletes all points """
-        # self._points = np.array(()).reshape((-1, 2))
-        self._paths = []
+        self._packedPaths = PackedPaths()
+        # deferred affine transform of the points (`3 x 3`), None if there is none
+        self._matrix = None
+        self._touch()
 
     def clearPath(self, pathIdx=None):
         """ Equal to clearPoints when not passing a path index """
@@ -235,25 +478,54 @@ class Base():
             self.clearPoints()
         elif isinstance(pathIdx, int):
             del self._paths[pathIdx]
+            self._touch()
 
-    def addPath(self):
-        """ Adds a new series of points of a path """
-        self._paths.append(np.array(()).reshape((-1, 2)))
+    def addPath(self, points=None):
+        """ Adds a new series of points of a path, which starts with `points` (`n x 2`) if passed """
+        self._paths.append(np.empty((0, 2)) if points is None else points)
+        self._touch()
 
     def getOutline(self, pathIdx=None):
         """ Returns the corner coordinates of the outline """
+        pathBounds, bounds = self._getBounds()
         if pathIdx is None:
-            return np.concatenate((
-                np.min(self.getPoints(), 0).reshape((1, 2)),
-                np.max(self.getPoints(), 0).reshape((1, 2))
-                ), 0)
-        elif isinstance(pathIdx, int) and pathIdx < len(self._paths):
-            return np.concatenate((
-                np.min(self._paths[pathIdx], 0).reshape((1, 2)),
-                np.max(self._paths[pathIdx], 0).reshape((1, 2)),
-            ), 0)
+            return bounds.copy()
+        elif isinstance(pathIdx, int) and pathIdx < self.getNumPaths():
+            return pathBounds[pathIdx].copy()
         raise Exception("cannot get outline for pathIdx: {}".format(pathIdx))
 
+    def _getBounds(self):
+        """
+        Returns the outlines of all paths (`numPaths x 2 x 2`, NaN for paths
+        without points) and of the geometry (`2 x 2`), which are cached until
+        the points change
+        """
+        cachedBounds = self._cachedBounds()
+        if cachedBounds is not None:
+            return cachedBounds
+
+        # transforms the points without baking the deferred transform into them
+        pathBounds = _pathBoundsOf(self._transformPoints(self._packedPaths.getPoints()), self._packedPaths.getOffsets())
+        bounds = self._boundsOfPaths(pathBounds[~np.isnan(pathBounds[:, 0, 0])])
+        self._keepBounds(pathBounds, bounds)
+        return pathBounds, bounds
+
+    def _cachedBounds(self):
+        """ Returns the cached outlines (see `_getBounds`), or None if the points changed since """
+        if self._boundsCache is None or self._boundsCache[0] != self._packedPaths.getRevision():
+            return None
+        return self._boundsCache[1:]
+
+    def _keepBounds(self, pathBounds, bounds):
+        """ Caches the outlines (see `_getBounds`) of the present points, until they or the transform change """
+        self._boundsCache = (self._packedPaths.getRevision(), pathBounds, bounds)
+
+    @staticmethod
+    def _boundsOfPaths(pathBounds):
+        if np.size(pathBounds, 0) == 0:
+            return np.full((2, 2), np.nan)
+        return np.stack((np.min(pathBounds[:, 0, :], 0), np.max(pathBounds[:, 1, :], 0)), 0)
+
     def getDimensions(self, pathIdx=None):
         """ Returns the width and height of the geometry or path of geometry """
         outline = self.getOutline(pathIdx)
@@ -261,7 +533,7 @@ class Base():
 
     def getCenter(self, center=Center.BY_OUTLINE):
         """ Returns the center coordinate """
-        if np.size(self.getPoints(), 0) == 0:
+        if self.getNumPoints() == 0:
             return None
         
         if isinstance(center, Center):
@@ -269,43 +541,39 @@ class Base():
                 outline = self.getOutline()
                 return np.mean(outline, 0)
             else:
-                return np.mean(self.getPoints(), 0)
+                # the mean commutes with the (affine) transform
+                self._materialize()
+                return self._transformPoints(np.mean(self._packedPaths.getPoints(), 0).reshape((1, 2)))[0, :]
         else:
             return convertToPoints(center)
 
     def rotateBy(self, angle, center=Center.BY_OUTLINE):
         """ Rotates all points in each path by an angle around a center """
-        center = self.getCenter(center).dot(np.array((1, 1j))).reshape((-1, 1))
-        for i in range(len(self._paths)):
-            # get points and turn into complex plane
-            points = self._paths[i].dot(np.array((1, 1j))).reshape((-1, 1))
-            # normalize points for rotation using center
-            points -= center
-            # rotate points by unity vector at an angle in compelex plane
-            points *= (np.cos(angle) + np.sin(angle)*1j) # FIXME change sign if y-axis is upside down 
-            # shift back to original location
-            points = points + center
-            # convert into normal coordinates
-            self._paths[i] = np.concatenate((
-                np.real(points).reshape((-1, 1)),
-                np.imag(points).reshape((-1, 1))), 1)
+        # rotating by a unity vector in the complex plane
+        self._transformAround(np.cos(angle) + np.sin(angle)*1j, self.getCenter(center)) # FIXME change sign if y-axis is upside down 
 
     def scaleBy(self, scale, center=Center.BY_OUTLINE):
         """ Scale the geometry by a value from center """
-        center = self.getCenter(center).dot(np.array((1, 1j))).reshape((-1, 1))
-        for i in range(len(self._paths)):
-            # get points and turn into complex plane
-            points = self._paths[i].dot(np.array((1, 1j))).reshape((-1, 1))
-            # normalize points for rotation using center
-            points -= center
-            # rotate points by unity vector at an angle in compelex plane
-            points *= scale
-            # shift back to original location
-            points = points + center
-            # convert into normal coordinates
-            self._paths[i] = np.concatenate((
-                np.real(points).reshape((-1, 1)),
-                np.imag(points).reshape((-1, 1))), 1)
+        center = self.getCenter(center)
+        cachedBounds = self._cachedBounds()
+        self._transformAround(scale, center)
+        if cachedBounds is not None and isinstance(scale, (int, float, np.floating)):
+            # scaling (unlike rotating) keeps the outline aligned to the axes
+            pathBounds, bounds = cachedBounds
+            pathBounds = (pathBounds - center) * scale + center
+            bounds = (bounds - center) * scale + center
+            if scale < 0:
+                pathBounds = pathBounds[:, ::-1, :]
+                bounds = bounds[::-1, :]
+            self._keepBounds(pathBounds, bounds)
+
+    def _transformAround(self, factor, center):
+        """ Multiplies all points (in the complex plane) by `factor` around `center` """
+        factor = complex(factor)
+        matrix = np.eye(3)
+        matrix[:2, :2] = ((factor.real, -factor.imag), (factor.imag, factor.real))
+        matrix[:2, 2] = center.reshape((2,)) - matrix[:2, :2].dot(center.reshape((2,)))
+        self._transformBy(matrix)
 
     def translateBy(self, translation, pathIdx=None):
         """ Translates the points of a paz by a vector described by `translation` """
@@ -314,20 +582,32 @@ class Base():
         if not isinstance(translation, np.ndarray):
             raise Exception("cannot translate unless a valid vector is provided")
 
+        # cached bounds are shifted along with uniform translations
+        isUniform = np.size(translation, 0) == 1
+
         if isinstance(pathIdx, int):
-            self._paths[pathIdx] += translation
-        if np.size(translation, 0) == 1:
-            # translate uniformly
-            for i in range(self.getNumPaths()):
-                # translate points
-                self._paths[i] += translation
-        elif np.size(translation, 0) == np.size(self.getPoints(), 0):
-            # translate points of paths individually
-            startIdx = 0
-            for i in range(self.getNumPaths()):
-                endIdx = startIdx + np.size(self._paths[i], 0)
-                self._paths[i] += translation[startIdx:endIdx,:]
-                startIdx = endIdx
+            # translate the points of one path only
+            paths = self._paths
+            cachedBounds = self._cachedBounds()
+            paths.translate(translation, pathIdx)
+            if cachedBounds is not None and isUniform:
+                # copies may share the cached outlines
+                pathBounds = cachedBounds[0].copy()
+                pathBounds[pathIdx] += translation
+                self._keepBounds(pathBounds, self._boundsOfPaths(pathBounds[~np.isnan(pathBounds[:, 0, 0])]))
+        elif isUniform:
+            # translate uniformly, which is deferred like rotating and scaling
+            cachedBounds = self._cachedBounds()
+            matrix = np.eye(3)
+            matrix[:2, 2] = translation[0, :]
+            self._transformBy(matrix)
+            if cachedBounds is not None:
+                pathBounds, bounds = cachedBounds
+                self._keepBounds(pathBounds + translation, bounds + translation)
+        elif np.size(translation, 0) == self.getNumPoints():
+            # translate each point individually
+            self._paths.translate(translation)
+        self._touch()
 
     def setLocation(self, reference, direction=None, offset=0.25):
         """ Moves the geometry to a location relative to a reference object """
@@ -352,33 +632,84 @@ class Base():
 
     def draw(self, context):
         """ Draws on the geometry on `context` (i.e. cairo) """        
-        if len(self._paths) == 0 or not isinstance(context, cairo.Context):
+        if self.getNumPaths() == 0 or not isinstance(context, cairo.Context):
             return
         
         # don't draw is hidden
         if self._isHidden:
             return
-        
-        for points in self._paths:
-            context.move_to(points[0, 0], points[0, 1])
-            # for i in range(1, np.size(points, 0)):
-            #     context.line_to(points[i, 0], points[i, 1])
-            for i in range(1, np.size(points, 0), 3):
-                context.curve_to(
-                    points[i, 0], points[i, 1],
-                    points[i+1, 0], points[i+1, 1],
-                    points[i+2, 0], points[i+2, 1])
-            # context.close_path()
 
+        self._pushClip(context)
+        scale = self._drawScale(context)
+        self._pushMatrix(context)
+        if self._isCairoPathCached(scale):
+            # replay the path built when the points last changed
+            context.append_path(self._cairoPathCache[0])
+        else:
+            _appendCurves(context, self._packedPaths)
+            # cairo returns the path in user space, i.e. in untransformed coordinates
+            self._keepCairoPath(context.copy_path(), scale)
+        self._popMatrix(context)
+
+        self._strokeAndFill(context, self._style)
+        self._popClip(context)
+
+    def _drawScale(self, context):
+        """ Returns (an upper bound of) how many pixels a unit of the untransformed points spans on `context` """
+        m = context.get_matrix()
+        a, b, c, d = m.xx, m.xy, m.yx, m.yy
+        if self._matrix is not None:
+            (p, q), (r, s) = self._matrix[:2, :2].tolist()
+            a, b, c, d = a*p + b*r, a*q + b*s, c*p + d*r, c*q + d*s
+        return max(math.hypot(a, c), math.hypot(b, d))
+
+    def _isCairoPathCached(self, scale):
+        """
+        Returns whether the cached cairo path is of the present points and
+        precise enough at `scale` (see `_drawScale`): cairo rounds the path
+        to 1/256 pixel at the scale it was built at, which grows with the scale
+        """
+        return self._cairoPathCache is not None \
+            and self._cairoPathCache[1] == self._packedPaths.getRevision() \
+            and scale <= self._cairoPathCache[2] * _PATH_SCALE_TOLERANCE
+
+    def _keepCairoPath(self, path, scale):
+        """ Caches the cairo `path` built at `scale` (see `_drawScale`) as that of the present points """
+        self._cairoPathCache = (path, self._packedPaths.getRevision(), scale)
+
+    def _pushClip(self, context):
+        """ Restricts drawing to the clip polygon (see `setClip`), in untransformed coordinates """
+        if self._clip is not None:
+            context.save()
+            context.new_path()
+            context.move_to(self._clip[0, 0], self._clip[0, 1])
+            [context.line_to(x, y) for x, y in self._clip[1:].tolist()]
+            context.close_path()
+            context.clip()
+
+    def _popClip(self, context):
+        if self._clip is not None:
+            context.restore()
+
+    def _pushMatrix(self, context):
+        """ Lets cairo apply the deferred transform to the untransformed points """
+        if self._matrix is not None:
+            m = self._matrix
+            context.save()
+            context.transform(cairo.Matrix(m[0, 0], m[1, 0], m[0, 1], m[1, 1], m[0, 2], m[1, 2]))
+
+    def _popMatrix(self, context):
+        """ Restores the matrix, as paths keep the transform but the stroke width must not be scaled by it """
+        if self._matrix is not None:
+            context.restore()
+
+    def _strokeAndFill(self, context, style):
+        """ Strokes and fills the path of `context` with `style` (see `_style`) or the gradients """
         if isinstance(self._strokeGradient, cairo.Gradient):
             context.set_source(self._strokeGradient)
         else:
-            context.set_source_rgba(
-                self._strokeColor[0],
-                self._strokeColor[1],
-                self._strokeColor[2],
-                self._strokeColor[3])
-        context.set_line_width(self._strokeWidth)
+            context.set_source_rgba(*style[_STROKE].tolist())
+        context.set_line_width(float(style[_WIDTH]))
         context.set_line_cap(cairo.LINE_CAP_ROUND)
         context.set_line_join(cairo.LINE_JOIN_ROUND)
         context.stroke_preserve()
@@ -386,9 +717,31 @@ class Base():
         if isinstance(self._fillGradient, cairo.Gradient):
             context.set_source(self._fillGradient)
         else:
-            context.set_source_rgba(
-                self._fillColor[0],
-                self._fillColor[1],
-                self._fillColor[2],
-                self._fillColor[3])
+            context.set_source_rgba(*style[_FILL].tolist())
         context.fill()
+
+def _pathBoundsOf(points, offsets):
+    """
+    Returns the outlines (`numPaths x 2 x 2`, NaN for paths without points)
+    of the paths of packed `points`, where path i starts at `offsets[i]`
+    """
+    pathBounds = np.full((len(offsets) - 1, 2, 2), np.nan)
+    nonEmpty = np.flatnonzero(np.diff(offsets) > 0)
+    if len(nonEmpty) > 0:
+        # each segment of `reduceat` spans a non-empty path and the empty paths after it
+        pathBounds[nonEmpty, 0, :] = np.minimum.reduceat(points, offsets[nonEmpty], 0)
+        pathBounds[nonEmpty, 1, :] = np.maximum.reduceat(points, offsets[nonEmpty], 0)
+    return pathBounds
+
+def _appendCurves(context, paths):
+    """ Appends `paths` (`n x 2` arrays of a start point and bezier curves) to `context` """
+    for points in paths:
+        if np.size(points, 0) == 0:
+            continue
+        context.move_to(points[0, 0], points[0, 1])
+        # for i in range(1, np.size(points, 0)):
+        #     context.line_to(points[i, 0], points[i, 1])
+        numCurves = (np.size(points, 0) - 1) // 3
+        for curve in points[1:1+3*numCurves, :].reshape((-1, 6)).tolist():
+            context.curve_to(*curve)
+        # context.close_path()
@@ -0,0 +1,213 @@
+from animlib.geometies.base import Base, Center, _appendCurves, _FILL, _STROKE, _WIDTH, _PATH_SCALE_TOLERANCE
+from animlib.utils.points import convertToPoints
+from animlib.utils.colors import convertToColor
+
+import numpy as np
+try:
+    import cairo
+except:
+    import cairocffi as cairo
+
+class Collection(Base):
+    """
+    Stores many shapes (items) as one geometry: the paths of all items are
+    packed into one array and each item has its own fill color, stroke color
+    and stroke width (rows of `_itemStyles`, laid out like `Base._style`).\n
+    Items sharing a style are drawn as one path, i.e. with one stroke and
+    fill per style rather than per item. The fill and stroke opacity of the
+    collection itself scale those of all items (e.g. for `FadeIn`), its
+    gradients replace the colors of all items and its clip (e.g. of
+    `Unveil`) applies to all items.
+    """
+
+    __slots__ = ("_itemPaths", "_itemStyles", "_itemStylesRevision", "_groups", "_groupsKey")
+
+    _POINT_ATTRIBUTES = Base._POINT_ATTRIBUTES + ("_itemPaths", "_groups", "_groupsKey")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(**kwargs)
+
+        # item i spans the paths `_itemPaths[i]:_itemPaths[i+1]`
+        self._itemPaths = np.zeros(1, dtype=int)
+        self._itemStyles = np.zeros((0, 9))
+        self._itemStylesRevision = 0
+        # list of (style, cairo path) of the items sharing a style, see `draw`
+        self._groups = None
+        # revisions of the points and item styles and the scale the groups were built at
+        self._groupsKey = None
+
+        self.add(*args)
+
+    def __getstate__(self):
+        """ Drops the cairo paths of the groups (which cannot be pickled) """
+        state = super().__getstate__()
+        state["_groups"] = None
+        state["_groupsKey"] = None
+        return state
+
+    def updateHash(self, hasher):
+        super().updateHash(hasher)
+        hasher.update(self._itemPaths.tobytes())
+        hasher.update(self._itemStyles.tobytes())
+
+    def add(self, *geometries):
+        """ Adds the paths and style of each geometry as a new item """
+        numPaths = [self.getNumPaths()]
+        styles = []
+        for geometry in geometries:
+            if not isinstance(geometry, Base):
+                raise Exception("can only add Base objects to a Collection")
+            if geometry.getNumPaths() == 0:
+                continue
+            [self._paths.append(points) for points in geometry._paths]
+            numPaths.append(self.getNumPaths())
+            styles.append(geometry._style)
+
+        if len(styles) > 0:
+            self._itemPaths = np.concatenate((self._itemPaths, numPaths[1:]))
+            self._itemStyles = np.concatenate((self._itemStyles, styles), 0)
+            self._touchItemStyles()
+        self._touch()
+
+    def getNumItems(self) -> int:
+        return np.size(self._itemStyles, 0)
+
+    def getItemFillColors(self) -> np.ndarray:
+        """ Returns the fill colors of all items (`numItems x 4`) """
+        return self._itemStyles[:, _FILL]
+
+    def getItemStrokeColors(self) -> np.ndarray:
+        """ Returns the stroke colors of all items (`numItems x 4`) """
+        return self._itemStyles[:, _STROKE]
+
+    def getItemStrokeWidths(self) -> np.ndarray:
+        return self._itemStyles[:, _WIDTH]
+
+    def _getStrokePadding(self):
+        if self.getNumItems() == 0:
+            return 0.0
+        return float(np.max(self._itemStyles[:, _WIDTH])) / 2
+
+    def setItemFill(self, color=None, opacity=None, items=None):
+        """ Sets the fill color and/or opacity of all (or some) items, either one for all or one per item """
+        items = slice(None) if items is None else items
+        if color is not None:
+            self._itemStyles[items, _FILL] = self._convertToColors(color)
+        if opacity is not None:
+            self._itemStyles[items, _FILL.start + 3] = opacity
+        self._touchItemStyles()
+
+    def setItemStroke(self, color=None, opacity=None, width=None, items=None):
+        """ Sets the stroke color, opacity and/or width of all (or some) items, either one for all or one per item """
+        items = slice(None) if items is None else items
+        if color is not None:
+            self._itemStyles[items, _STROKE] = self._convertToColors(color)
+        if opacity is not None:
+            self._itemStyles[items, _STROKE.start + 3] = opacity
+        if width is not None:
+            self._itemStyles[items, _WIDTH] = width
+        self._touchItemStyles()
+
+    def getItemOutlines(self) -> np.ndarray:
+        """ Returns the corner coordinates of the outline of each item (`numItems x 2 x 2`) """
+        pathBounds, _ = self._getBounds()
+        if self.getNumItems() == 0:
+            return np.zeros((0, 2, 2))
+        # `fmin`/`fmax` ignore the NaN bounds of paths without points
+        starts = self._itemPaths[:-1]
+        return np.stack((
+            np.fmin.reduceat(pathBounds[:, 0, :], starts, 0),
+            np.fmax.reduceat(pathBounds[:, 1, :], starts, 0)), 1)
+
+    def getItemCenters(self, center=Center.BY_OUTLINE) -> np.ndarray:
+        """ Returns the center of each item (`numItems x 2`) """
+        if center == Center.BY_OUTLINE:
+            return np.mean(self.getItemOutlines(), 1)
+        pointOffsets = self._packedPaths.getOffsets()[self._itemPaths]
+        return np.add.reduceat(self._paths.getPoints(), pointOffsets[:-1], 0) / np.diff(pointOffsets).reshape((-1, 1))
+
+    def translateItems(self, translation):
+        """ Translates each item by its own vector (`numItems x 2`) or all by one vector """
+        translation = convertToPoints(translation)
+        if np.size(translation, 0) == 1:
+            self.translateBy(translation)
+        else:
+            self.translateBy(self._repeatPerPoint(translation))
+
+    def scaleItems(self, scale, center=Center.BY_OUTLINE):
+        """ Scales each item by its own value (or all by one value) around its center """
+        if isinstance(center, Center):
+            centers = self.getItemCenters(center)
+        else:
+            centers = convertToPoints(center)
+        scale = np.asarray(scale, dtype=float).reshape((-1, 1))
+        centers = self._repeatPerPoint(centers) if np.size(centers, 0) > 1 else centers
+        scale = self._repeatPerPoint(scale) if np.size(scale, 0) > 1 else scale
+        self._paths.setPoints((self._paths.getPoints() - centers) * scale + centers)
+        self._touch()
+
+    def _repeatPerPoint(self, values):
+        """ Repeats one row of `values` per item for each point of the item """
+        if np.size(values, 0) != self.getNumItems():
+            raise Exception("must pass one value per item")
+        numPoints = np.diff(self._packedPaths.getOffsets()[self._itemPaths])
+        return np.repeat(values, numPoints, 0)
+
+    def _convertToColors(self, color):
+        """ Converts one color (see `convertToColor`) unless passing one RGBA row per item """
+        if isinstance(color, np.ndarray) and color.ndim == 2:
+            return color
+        return convertToColor(color)
+
+    def _touchItemStyles(self):
+        self._itemStylesRevision += 1
+        self._touch()
+
+    def draw(self, context):
+        """ Draws all items, with one path per style of the items """
+        if self.getNumItems() == 0 or not isinstance(context, cairo.Context):
+            return
+
+        # don't draw is hidden
+        if self._isHidden:
+            return
+
+        groupsKey = (self._packedPaths.getRevision(), self._itemStylesRevision)
+        scale = self._drawScale(context)
+        # NB: like `Base.draw`, the group paths are rebuilt if drawn much larger than when built
+        if self._groupsKey is None or self._groupsKey[:2] != groupsKey \
+            or scale > self._groupsKey[2] * _PATH_SCALE_TOLERANCE:
+            self._groups = None
+
+        self._pushClip(context)
+        if self._groups is None:
+            # group the items by style and build one path per group
+            styles, inverse = np.unique(self._itemStyles, axis=0, return_inverse=True)
+            inverse = inverse.reshape((-1,))
+            self._groups = []
+            for g in range(np.size(styles, 0)):
+                items = np.flatnonzero(inverse == g)
+                self._pushMatrix(context)
+                _appendCurves(context, (
+                    self._packedPaths[p]
+                    for i in items
+                    for p in range(self._itemPaths[i], self._itemPaths[i+1])))
+                # cairo returns the path in user space, i.e. in untransformed coordinates
+                self._groups.append((styles[g], context.copy_path()))
+                self._popMatrix(context)
+                self._strokeAndFill(context, self._scaleOpacity(styles[g]))
+            self._groupsKey = groupsKey + (scale,)
+        else:
+            for style, path in self._groups:
+                self._pushMatrix(context)
+                context.append_path(path)
+                self._popMatrix(context)
+                self._strokeAndFill(context, self._scaleOpacity(style))
+        self._popClip(context)
+
+    def _scaleOpacity(self, style):
+        """ Scales the opacities of an item style by those of the collection """
+        style = style.copy()
+        style[_FILL.start + 3] *= self._style[_FILL.start + 3]
+        style[_STROKE.start + 3] *= self._style[_STROKE.start + 3]
+        return style
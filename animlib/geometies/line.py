@@ -3,6 +3,8 @@ from animlib.utils.points import convertToPoints, interpolateLinear, sliceBezier
 import numpy as np
 
 class Line(Base):
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         # Make transparent unless otherwise specified
         if not any([k in kwargs.keys() for k in ["fillColor", "fill_color"]]):
@@ -25,5 +27,4 @@ class Line(Base):
             if key in ["end", "End"]:
                 end = convertToPoints(arg)
         
-        self.addPath()
-        self.addPoint(interpolateLinear(start, end))
+        self.addPath(interpolateLinear(start, end))
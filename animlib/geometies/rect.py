@@ -1,42 +1,39 @@
 from animlib.geometies.base import Base
-from animlib.utils.points import convertToPoints, interpolateLinear
+import numpy as np
+
+# start point and four straight edges (as bezier curves) of a unit square
+_UNIT_SQUARE = np.array((
+    (0, 0),
+    (1/3, 0), (2/3, 0), (1, 0),
+    (1, 1/3), (1, 2/3), (1, 1),
+    (2/3, 1), (1/3, 1), (0, 1),
+    (0, 2/3), (0, 1/3), (0, 0)), dtype=float)
 
 class Rect(Base):
-    
+    # the corner and size are only kept as points, which are moved by transforms
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         assert len(args) == 0 or len(args) == 4, "either pass 4 arguments for x, y, w, h or no unnamed arguments"
         super().__init__(**kwargs)
 
-        self._x = args[0] if len(args) > 0 else 0.0 
-        self._y = args[1] if len(args) > 1 else 0.0
-        self._w = args[2] if len(args) > 2 else 1.0
-        self._h = args[3] if len(args) > 3 else 1.0
+        x = args[0] if len(args) > 0 else 0.0 
+        y = args[1] if len(args) > 1 else 0.0
+        w = args[2] if len(args) > 2 else 1.0
+        h = args[3] if len(args) > 3 else 1.0
 
         for key in kwargs:
             arg = kwargs[key]
             if key in ["x", "X"]:
-                self._x = float(arg) 
+                x = float(arg) 
             if key in ["y", "Y"]:
-                self._y = float(arg) 
+                y = float(arg) 
             if key in ["w", "W"]:
-                self._w = float(arg) 
+                w = float(arg) 
             if key in ["h", "H"]:
-                self._h = float(arg)
+                h = float(arg)
 
-        self._convertRectToPoints()
+        self._convertRectToPoints(x, y, w, h)
         
-    def _convertRectToPoints(self):
-        super().addPath()
-        start = convertToPoints((self._x, self._y))
-        self.addPoint(start)
-        end = convertToPoints((self._x+self._w, self._y))
-        self.addPoint(interpolateLinear(start, end)[1:,:])
-        start = end
-        end = convertToPoints((self._x+self._w, self._y+self._h))
-        self.addPoint(interpolateLinear(start, end)[1:,:])
-        start = end
-        end = convertToPoints((self._x, self._y+self._h))
-        self.addPoint(interpolateLinear(start, end)[1:,:])
-        start = end
-        end = convertToPoints((self._x, self._y))
-        self.addPoint(interpolateLinear(start, end)[1:,:])
\ No newline at end of file
+    def _convertRectToPoints(self, x, y, w, h):
+        super().addPath(_UNIT_SQUARE * (w, h) + (x, y))
@@ -2,12 +2,33 @@ import os, re
 from xml.dom import minidom
 import numpy as np
 
-from animlib.geometies.base import Base, Center
+from animlib.geometies.base import Base, Center, _appendCurves, _pathBoundsOf
 from animlib.utils.points import convertToPoints, interpolateLinear
+from animlib.utils.paths import PackedPaths
+
+try:
+    import cairo
+except:
+    import cairocffi as cairo
 
 class SVG(Base):
+    """
+    Geometry of the paths of an SVG file.\n
+    Paths placed by `<use>` (e.g. glyphs in dvisvgm output) are instanced:
+    each referenced path is stored once (`_symbols`) and each use only as
+    the index of its symbol and an offset. The instances are drawn by
+    replaying the symbol paths under translated matrices and are only
+    turned into points of their own (i.e. materialized) once the points are
+    read or edited.
+    """
+
+    _POINT_ATTRIBUTES = Base._POINT_ATTRIBUTES + ("_symbols", "_instanceSymbols", "_instanceOffsets", "_pathsUsed")
 
     def __init__(self, **kwargs):
+        # set before `Base.__init__`, which may already read the points
+        self._symbols = None
+        self._instanceSymbols = None
+        self._instanceOffsets = None
         super().__init__(**kwargs)
         self._svgFile = None
 
@@ -188,12 +209,117 @@ class SVG(Base):
         self.addPoint(interpolateLinear(start, end)[1:,:])
 
     def _applyUses(self):
+        """ Replaces the referenced paths by symbols and records their uses as instances """
         definitions = len(self._pathsUsed)
+        instanceSymbols = []
+        instanceOffsets = []
         for i, key in zip(range(definitions), self._pathsUsed.keys()):
             for offset in self._pathsUsed[key]:
-                super().addPath()
-                self.addPoint(self._paths[i])
-                self.translateBy(offset, -1)
+                instanceSymbols.append(i)
+                instanceOffsets.append(convertToPoints(offset))
+
+        self._symbols = PackedPaths([self._packedPaths[i] for i in range(definitions)])
+        for _ in range(definitions):
+            self.clearPath(0)
+
+        if len(instanceSymbols) > 0:
+            self._instanceSymbols = np.array(instanceSymbols, dtype=int)
+            self._instanceOffsets = np.concatenate(instanceOffsets, 0)
+            self._touch()
+
+    def _materialize(self):
+        """ Appends a path with the points of each instance """
+        if self._instanceSymbols is None:
+            return
+        symbolOffsets = self._symbols.getOffsets()
+        numPoints = np.diff(symbolOffsets)[self._instanceSymbols]
+        # index of each instance point into the points of the symbols
+        firstPoints = np.repeat(symbolOffsets[self._instanceSymbols] - (np.cumsum(numPoints) - numPoints), numPoints)
+        points = self._symbols.getPoints()[firstPoints + np.arange(np.sum(numPoints))]
+        points = points + np.repeat(self._instanceOffsets, numPoints, 0)
+
+        # the points are the same, i.e. cached outlines and paths stay valid
+        cachedBounds = self._cachedBounds()
+        isPathCached = self._cairoPathCache is not None \
+            and self._cairoPathCache[1] == self._packedPaths.getRevision()
+        self._packedPaths.appendPaths(points, numPoints)
+        self._instanceSymbols = None
+        self._instanceOffsets = None
+        if cachedBounds is not None:
+            self._keepBounds(*cachedBounds)
+        if isPathCached:
+            self._keepCairoPath(self._cairoPathCache[0], self._cairoPathCache[2])
+
+    def clearPoints(self):
+        self._instanceSymbols = None
+        self._instanceOffsets = None
+        super().clearPoints()
+
+    def getNumPaths(self) -> int:
+        numInstances = 0 if self._instanceSymbols is None else len(self._instanceSymbols)
+        return len(self._packedPaths) + numInstances
+
+    def getNumPoints(self) -> int:
+        if self._instanceSymbols is None:
+            return super().getNumPoints()
+        numPoints = np.diff(self._symbols.getOffsets())[self._instanceSymbols]
+        return super().getNumPoints() + int(np.sum(numPoints))
+
+    def updateHash(self, hasher):
+        super().updateHash(hasher)
+        if self._instanceSymbols is not None:
+            hasher.update(self._symbols.getOffsets().tobytes())
+            hasher.update(np.ascontiguousarray(self._symbols.getPoints()).tobytes())
+            hasher.update(self._instanceSymbols.tobytes())
+            hasher.update(self._instanceOffsets.tobytes())
+
+    def _getBounds(self):
+        """ Computes the outlines of the instances from those of their symbols """
+        if self._instanceSymbols is None or self._cachedBounds() is not None:
+            return super()._getBounds()
+        if self._matrix is not None and (self._matrix[0, 1] != 0 or self._matrix[1, 0] != 0):
+            # the outline of a rotated symbol differs from the rotated outline of the symbol
+            self._materialize()
+            return super()._getBounds()
+
+        symbolBounds = _pathBoundsOf(self._symbols.getPoints(), self._symbols.getOffsets())
+        pathBounds = np.concatenate((
+            _pathBoundsOf(self._packedPaths.getPoints(), self._packedPaths.getOffsets()),
+            symbolBounds[self._instanceSymbols] + self._instanceOffsets.reshape((-1, 1, 2))), 0)
+        if self._matrix is not None:
+            # scaling and translating keeps the outlines aligned to the axes
+            pathBounds = np.sort(pathBounds * np.diag(self._matrix)[:2] + self._matrix[:2, 2], 1)
+
+        bounds = self._boundsOfPaths(pathBounds[~np.isnan(pathBounds[:, 0, 0])])
+        self._keepBounds(pathBounds, bounds)
+        return pathBounds, bounds
+
+    def draw(self, context):
+        """ Builds the path of the instances by replaying the symbol paths under translated matrices """
+        if self._instanceSymbols is None or not isinstance(context, cairo.Context) or self._isHidden \
+            or self._isCairoPathCached(self._drawScale(context)):
+            super().draw(context)
+            return
+
+        self._pushClip(context)
+        scale = self._drawScale(context)
+        self._pushMatrix(context)
+        symbolPaths = []
+        for points in self._symbols:
+            _appendCurves(context, [points])
+            symbolPaths.append(context.copy_path())
+            context.new_path()
+
+        _appendCurves(context, self._packedPaths)
+        for symbol, (dx, dy) in zip(self._instanceSymbols.tolist(), self._instanceOffsets.tolist()):
+            context.save()
+            context.translate(dx, dy)
+            context.append_path(symbolPaths[symbol])
+            context.restore()
+
+        # later frames replay the whole path at once (see `Base.draw`)
+        self._keepCairoPath(context.copy_path(), scale)
+        self._popMatrix(context)
 
-        for _ in range(len(self._pathsUsed)):
-            self.clearPath(0)
\ No newline at end of file
+        self._strokeAndFill(context, self._style)
+        self._popClip(context)
@@ -0,0 +1,244 @@
+import numpy as np
+import itertools
+
+# revisions are unique across all packed paths, see `PackedPaths.getRevision`
+_revisions = itertools.count()
+
+class PackedPaths():
+    """
+    Stores the points of all paths of a geometry in one contiguous `N x 2`
+    array, together with the index at which each path starts.\n
+    Behaves like a list of `n x 2` arrays (one per path): indexing returns a
+    read-only view into the packed array, while assigning, inserting,
+    appending and deleting paths edit the packed array. Appending points
+    grows the array by doubling, i.e. in amortized constant time.\n
+    NB: views are only valid until the next edit that changes the number of
+    points.\n
+    Copies share the packed array until either of them is edited
+    (copy-on-write), unless the points were relocated (see `relocate`).
+    """
+
+    __slots__ = ("_buffer", "_offsets", "_revision", "_isShared", "_isRelocated")
+
+    def __init__(self, paths=None):
+        self._buffer = np.empty((0, 2))
+        # path i spans the rows `_offsets[i]:_offsets[i+1]` of `_buffer`
+        self._offsets = [0]
+        self._revision = next(_revisions)
+        # True if `_buffer` may be shared with a copy
+        self._isShared = False
+        # True if `_buffer` is a view into an array written by others, see `relocate`
+        self._isRelocated = False
+        if paths is not None:
+            [self.append(p) for p in paths]
+
+    def __getstate__(self):
+        # drop the unused capacity, e.g. when sending geometries to workers
+        return (self._buffer[:self._offsets[-1]].copy(), self._offsets, self._revision)
+
+    def __setstate__(self, state):
+        self._buffer, self._offsets, self._revision = state
+        self._isShared = False
+        self._isRelocated = False
+
+    def copy(self):
+        """ Returns a copy, which shares the packed array until either is edited """
+        result = PackedPaths.__new__(PackedPaths)
+        result._offsets = list(self._offsets)
+        result._revision = self._revision
+        result._isRelocated = False
+        if self._isRelocated:
+            # relocated points are written in place, i.e. cannot be shared
+            result._buffer = self._buffer[:self._offsets[-1]].copy()
+            result._isShared = False
+        else:
+            result._buffer = self._buffer
+            result._isShared = self._isShared = True
+        return result
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        idx = self._pathIndex(idx)
+        view = self._buffer[self._offsets[idx]:self._offsets[idx+1]]
+        view.flags.writeable = False
+        return view
+
+    def __setitem__(self, idx, points):
+        idx = self._pathIndex(idx)
+        self._splice(self._offsets[idx], self._offsets[idx+1], points)
+        delta = np.size(points, 0) - (self._offsets[idx+1] - self._offsets[idx])
+        if delta != 0:
+            self._offsets[idx+1:] = [o + delta for o in self._offsets[idx+1:]]
+
+    def __delitem__(self, idx):
+        idx = self._pathIndex(idx)
+        start, stop = self._offsets[idx], self._offsets[idx+1]
+        self._splice(start, stop, self._buffer[:0])
+        del self._offsets[idx+1]
+        self._offsets[idx+1:] = [o - (stop - start) for o in self._offsets[idx+1:]]
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def insert(self, idx, points):
+        """ Inserts a new path with `points` before the path at `idx` """
+        if idx >= len(self):
+            self.append(points)
+            return
+        idx = self._pathIndex(idx)
+        points = self._asPoints(points)
+        start = self._offsets[idx]
+        self._splice(start, start, points)
+        n = len(points)
+        self._offsets[idx+1:] = [o + n for o in self._offsets[idx+1:]]
+        self._offsets.insert(idx+1, start + n)
+
+    def append(self, points):
+        """ Appends a new path with `points` """
+        points = self._asPoints(points)
+        end = self._offsets[-1]
+        self._own()
+        self._reserve(end + len(points))
+        self._buffer[end:end+len(points)] = points
+        self._appendOffsets([end + len(points)])
+        self._revision = next(_revisions)
+
+    def appendPaths(self, points, numPointsPerPath):
+        """ Appends one new path per entry of `numPointsPerPath`, taking their points in order from `points` """
+        points = self._asPoints(points)
+        end = self._offsets[-1]
+        self._own()
+        self._reserve(end + len(points))
+        self._buffer[end:end+len(points)] = points
+        self._appendOffsets((end + np.cumsum(numPointsPerPath, dtype=int)).tolist())
+        self._revision = next(_revisions)
+
+    def extend(self, points):
+        """ Appends `points` to the last path """
+        assert len(self) > 0, "Object has no path"
+        points = self._asPoints(points)
+        n = len(points)
+        end = self._offsets[-1]
+        self._own()
+        self._reserve(end + n)
+        self._buffer[end:end+n] = points
+        self._offsets[-1] = end + n
+        self._revision = next(_revisions)
+
+    def getPoints(self) -> np.ndarray:
+        """ Returns all points as one (read-only) `N x 2` view """
+        view = self._buffer[:self._offsets[-1]]
+        view.flags.writeable = False
+        return view
+
+    def setPoints(self, points):
+        """ Overwrites all points in place (the number of points must not change) """
+        self._own()
+        self._buffer[:self._offsets[-1]] = points
+        self._revision = next(_revisions)
+
+    def relocate(self, buffer):
+        """
+        Moves the points into `buffer` (a writable `N x 2` array, e.g. a view
+        of an array holding the points of many paths), where others may
+        overwrite them in place (followed by `touch`). They stay there until
+        more points are added
+        """
+        buffer[:] = self._buffer[:self._offsets[-1]]
+        self._buffer = buffer
+        self._isShared = False
+        self._isRelocated = True
+        self._revision = next(_revisions)
+
+    def release(self):
+        """ Moves the points out of the array passed to `relocate` into an array of their own """
+        if not self._isRelocated:
+            return
+        self._buffer = self._buffer[:self._offsets[-1]].copy()
+        self._isRelocated = False
+
+    def touch(self):
+        """ Marks the points as modified, e.g. after writing into the array passed to `relocate` """
+        self._revision = next(_revisions)
+
+    def translate(self, translation, pathIdx=None):
+        """ Adds `translation` (`1 x 2` or one row per point) to all points or a path """
+        self._own()
+        if pathIdx is None:
+            self._buffer[:self._offsets[-1]] += translation
+        else:
+            idx = self._pathIndex(pathIdx)
+            self._buffer[self._offsets[idx]:self._offsets[idx+1]] += translation
+        self._revision = next(_revisions)
+
+    def getNumPoints(self) -> int:
+        return self._offsets[-1]
+
+    def getNumPointsOfPath(self, idx) -> int:
+        idx = self._pathIndex(idx)
+        return self._offsets[idx+1] - self._offsets[idx]
+
+    def getOffsets(self) -> np.ndarray:
+        """ Returns the index of the first point of each path and the number of points """
+        return np.array(self._offsets)
+
+    def getRevision(self) -> int:
+        """ Returns a number that changes whenever points change """
+        return self._revision
+
+    def _pathIndex(self, idx):
+        if not isinstance(idx, (int, np.integer)):
+            raise TypeError("path index must be an integer")
+        n = len(self)
+        if idx < -n or idx >= n:
+            raise IndexError("path index out of range")
+        return int(idx) % n
+
+    def _asPoints(self, points):
+        points = np.asarray(points, dtype=float).reshape((-1, 2))
+        if np.may_share_memory(points, self._buffer):
+            points = points.copy()
+        return points
+
+    def _appendOffsets(self, offsets):
+        """ Appends the ends of new paths (a list) to `_offsets` """
+        if len(self._offsets) == 1:
+            # the first paths are stored without spare capacity, as most shapes have one path
+            self._offsets = self._offsets + offsets
+        else:
+            self._offsets += offsets
+
+    def _own(self):
+        """ Copies the packed array before editing it if it may be shared """
+        if self._isShared:
+            self._buffer = self._buffer.copy()
+            self._isShared = False
+            self._isRelocated = False
+
+    def _reserve(self, numPoints):
+        """ Grows the buffer (at least by doubling) to hold at least `numPoints` """
+        capacity = len(self._buffer)
+        if numPoints <= capacity:
+            return
+        # the first points are stored without spare capacity, as most shapes never grow
+        capacity = max(2 * capacity, numPoints)
+        buffer = np.empty((capacity, 2))
+        buffer[:self._offsets[-1]] = self._buffer[:self._offsets[-1]]
+        self._buffer = buffer
+        self._isRelocated = False
+
+    def _splice(self, start, stop, points):
+        """ Replaces the rows `start:stop` by `points`, moving all following rows """
+        points = self._asPoints(points)
+        n = len(points)
+        end = self._offsets[-1]
+        delta = n - (stop - start)
+        self._own()
+        self._reserve(end + delta)
+        if delta != 0:
+            self._buffer[stop+delta:end+delta] = self._buffer[stop:end]
+        self._buffer[start:start+n] = points
+        self._revision = next(_revisions)
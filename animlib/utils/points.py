@@ -15,9 +15,10 @@ def convertToPoints(val) -> np.ndarray:
 
 
 def interpolateLinear(start, end, num=4):
-    x = np.linspace(start[0,0], end[0,0], num).reshape((num, 1))
-    y = np.linspace(start[0,1], end[0,1], num).reshape((num, 1))
-    return np.concatenate((x, y), 1)
+    """ Returns `num` points (`num x 2`) evenly spaced from `start` to `end` (`1 x 2` each) """
+    (x0, y0), (x1, y1) = start[0, :].tolist(), end[0, :].tolist()
+    # with Python floats, as numpy has a large overhead for a few points
+    return np.array([((1 - t) * x0 + t * x1, (1 - t) * y0 + t * y1) for t in (i / (num - 1) for i in range(num))])
 
 def sliceBezier(points, t=0.5):
     if not isinstance(points, np.ndarray) or np.size(points, 0) != 4 or np.size(points, 1) != 2:
@@ -49,3 +50,72 @@ def sliceBezier(points, t=0.5):
     return np.array([(x1, y1),
         (x12, y12), (x123, y123), (x1234, y1234),
         (x234, y234), (x34, y34), (x4, y4)]).reshape((7, 2))
+
+
+def _blossom(controls, u, v, w):
+    """ Evaluates the blossom of cubic bezier segments (`m x 4 x 2`) at `u`, `v` and `w` (one value per segment) """
+    for t in (u, v, w):
+        t = t.reshape((-1, 1, 1))
+        controls = controls[:, :-1] * (1-t) + controls[:, 1:] * t
+    return controls[:, 0]
+
+def sliceBeziers(points, numSplits):
+    """
+    Splits each cubic bezier segment of a path (`3n+1 x 2` points) into
+    `numSplits[i]+1` segments of equal parameter range, all in one pass
+    """
+    points = np.asarray(points, dtype=float)
+    numSegments = (np.size(points, 0) - 1) // 3
+    numSplits = np.asarray(numSplits, dtype=int).reshape((-1,))
+    if np.ndim(points) != 2 or np.size(points, 1) != 2 or np.size(points, 0) != 3*numSegments+1 or np.size(numSplits) != numSegments:
+        raise Exception("3n+1x2 ndarray and n numbers of splits must be passed")
+
+    numPieces = numSplits + 1
+    # segment of each new piece and index of the piece within its segment
+    segments = np.repeat(np.arange(numSegments), numPieces)
+    pieces = np.arange(np.size(segments)) - np.repeat(np.cumsum(numPieces) - numPieces, numPieces)
+    t0 = pieces / numPieces[segments]
+    t1 = (pieces + 1) / numPieces[segments]
+    controls = points[3*segments.reshape((-1, 1)) + np.arange(4)]
+
+    result = np.empty((3*np.size(segments)+1, 2))
+    result[0] = points[0]
+    result[1::3] = _blossom(controls, t0, t0, t1)
+    result[2::3] = _blossom(controls, t0, t1, t1)
+    result[3::3] = _blossom(controls, t1, t1, t1)
+    return result
+
+def distributeSplits(lengths, num):
+    """ Distributes `num` splits over segments in proportion to their `lengths` (largest remainder method) """
+    lengths = np.asarray(lengths, dtype=float).reshape((-1,))
+    total = np.sum(lengths)
+    if total > 0:
+        shares = num * lengths / total
+    else:
+        shares = np.full(np.size(lengths), num / np.size(lengths))
+    splits = np.floor(shares).astype(int)
+    # the remaining splits go to the largest remainders (ties to the first segments)
+    splits[np.argsort(splits - shares, kind="stable")[:num - np.sum(splits)]] += 1
+    return splits
+
+def resampleBeziers(points, numPoints):
+    """
+    Returns a path of cubic bezier segments (`3n+1 x 2` points) with
+    `numPoints` points describing the same curve, by splitting its segments
+    (the longer the segment, the more often)
+    """
+    points = np.asarray(points, dtype=float).reshape((-1, 2))
+    n = np.size(points, 0)
+    if n == numPoints:
+        return points
+    if n == 0 or numPoints < n or (numPoints - n) % 3 != 0:
+        raise Exception("can only add multiples of 3 points to a (non-empty) path")
+    if n == 1:
+        return np.repeat(points, numPoints, 0)
+    if (n - 1) % 3 != 0:
+        raise Exception("path must consist of cubic bezier segments, i.e. 3n+1 points")
+
+    # the length of the control polygon approximates (and bounds) that of the segment
+    controls = points[3*np.arange((n-1)//3).reshape((-1, 1)) + np.arange(4)]
+    lengths = np.sum(np.linalg.norm(np.diff(controls, 1, 1), axis=2), 1)
+    return sliceBeziers(points, distributeSplits(lengths, (numPoints - n) // 3))
@@ -0,0 +1,80 @@
+import json, csv
+
+class RenderProfiler():
+    """
+    Records how long each phase of rendering takes per frame.\n
+    Phases are `animation` (stepping all animations), `draw:<Class>` (drawing
+    all geometries of a class), `background` (painting the background and
+    cached layers), `copy` (pickling the changed geometries for and waiting
+    for the frame of a render worker), `queue` (waiting for a free surface or
+    queue slot) and `write` (writing the frame to the movie pipe).\n
+    With render workers, the timings of the worker processes are not recorded
+    and the `copy` timings of a frame are recorded as they happen, i.e. may
+    be attributed to a later frame.
+    """
+
+    def __init__(self):
+        self._frame = -1
+        # list of (frame, phase, seconds)
+        self._records = []
+
+    def nextFrame(self) -> int:
+        """ Starts recording a new frame and returns its index """
+        self._frame += 1
+        return self._frame
+
+    def getFrame(self) -> int:
+        return self._frame
+
+    def record(self, phase, seconds, frame=None):
+        """ Adds `seconds` to `phase` of the present (or a given) frame """
+        # NB: appending to a list is thread-safe, i.e. the writer thread may record too
+        self._records.append((self._frame if frame is None else frame, phase, seconds))
+
+    def getTimings(self):
+        """ Returns `{frame: {phase: seconds}}` """
+        timings = {}
+        for frame, phase, seconds in self._records:
+            phases = timings.setdefault(frame, {})
+            phases[phase] = phases.get(phase, 0.0) + seconds
+        return timings
+
+    def getTotals(self):
+        """ Returns `{phase: seconds}` summed over all frames """
+        totals = {}
+        for _, phase, seconds in self._records:
+            totals[phase] = totals.get(phase, 0.0) + seconds
+        return totals
+
+    def summary(self) -> str:
+        """ Returns a table of the total and per frame time of each phase """
+        totals = self.getTotals()
+        numFrames = max(len(self.getTimings()), 1)
+        totalTime = max(sum(totals.values()), 1e-12)
+        lines = ["{:<24}{:>12}{:>12}{:>8}".format("phase", "total [s]", "frame [ms]", "share")]
+        for phase in sorted(totals, key=totals.get, reverse=True):
+            lines.append("{:<24}{:>12.3f}{:>12.3f}{:>7.1f}%".format(
+                phase,
+                totals[phase],
+                totals[phase] / numFrames * 1000,
+                totals[phase] / totalTime * 100))
+        return "\n".join(lines)
+
+    def exportJSON(self, filePath):
+        """ Writes the timings of each frame and the totals into a JSON file """
+        timings = self.getTimings()
+        with open(filePath, "w", encoding="utf-8") as jsonFile:
+            json.dump({
+                "frames": [{"frame": f, "phases": timings[f]} for f in sorted(timings)],
+                "totals": self.getTotals(),
+            }, jsonFile, indent=2)
+
+    def exportCSV(self, filePath):
+        """ Writes one row of `frame, phase, seconds` per recorded timing """
+        timings = self.getTimings()
+        with open(filePath, "w", encoding="utf-8", newline="") as csvFile:
+            writer = csv.writer(csvFile)
+            writer.writerow(["frame", "phase", "seconds"])
+            for frame in sorted(timings):
+                for phase in sorted(timings[frame]):
+                    writer.writerow([frame, phase, timings[frame][phase]])
@@ -0,0 +1,73 @@
+import time
+from tqdm import tqdm
+
+class Progress():
+    """
+    Reports the progress of `Canvas.animate` and `Canvas.wait`.\n
+    This base class reports nothing, i.e. it can be used to silence the canvas.
+    """
+
+    def begin(self, desc, total):
+        """ Starts reporting a task `desc` of `total` frames """
+        pass
+
+    def update(self, n=1):
+        """ Reports that `n` more frames are done """
+        pass
+
+    def end(self):
+        """ Finishes reporting the present task """
+        pass
+
+class TqdmProgress(Progress):
+    """ Shows a `tqdm` progress bar, which refreshes at most every `interval` seconds """
+
+    def __init__(self, interval=0.1):
+        self._interval = interval
+        self._progressBar = None
+        self._progressBarStyle = "{desc:<8}{percentage:3.0f}%|{bar}|{n_fmt:3s}/{total_fmt:3s}[{elapsed}<{remaining},{rate_fmt}{postfix}]"
+
+    def begin(self, desc, total):
+        self._progressBar = tqdm(
+            total=total,
+            desc=desc,
+            bar_format=self._progressBarStyle,
+            mininterval=self._interval)
+
+    def update(self, n=1):
+        self._progressBar.update(n)
+
+    def end(self):
+        self._progressBar.close()
+        self._progressBar = None
+
+class CallbackProgress(Progress):
+    """
+    Calls `callback(desc, n, total)` at most every `interval` seconds and
+    once more when the task ends
+    """
+
+    def __init__(self, callback, interval=0.1):
+        self._callback = callback
+        self._interval = interval
+        self._desc = ""
+        self._n = 0
+        self._total = 0
+        self._lastCall = 0.0
+
+    def begin(self, desc, total):
+        self._desc = desc
+        self._n = 0
+        self._total = total
+        self._lastCall = time.perf_counter()
+        self._callback(self._desc, self._n, self._total)
+
+    def update(self, n=1):
+        self._n += n
+        now = time.perf_counter()
+        if now - self._lastCall >= self._interval:
+            self._lastCall = now
+            self._callback(self._desc, self._n, self._total)
+
+    def end(self):
+        self._callback(self._desc, self._n, self._total)
@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+from animlib import *
+from animlib.utils.progress import Progress
+import argparse, concurrent.futures, copy, json, multiprocessing, os, resource, shutil, sys, tempfile, time, tracemalloc
+import numpy as np
+try:
+    import cairo
+except:
+    import cairocffi as cairo
+
+def peakRSS():
+    """ Returns the peak resident set size of this process in MB (each scene runs in its own process, see `runScene`) """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def newCanvas(args, name="benchmark", workers=0):
+    return Canvas(
+        name,
+        width=args.width,
+        height=args.height,
+        fps=args.fps,
+        movieFileExtension=None if args.sink == "null" else ".mp4",
+        workers=workers,
+        progress=Progress(),
+        profile=True)
+
+def writeGlyphSvg(filePath, numGlyphs, numSymbols=40, glyphsPerRow=50):
+    """ Writes an SVG that, like dvisvgm output, places glyphs with `<use>` """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">',
+        '<defs>']
+    for s in range(numSymbols):
+        # a closed outline of 8 cubic segments with a slightly different shape per symbol
+        r = 2.0 + (s % 5) * 0.3
+        d = "M {:.3f} 0 ".format(r)
+        for k in range(8):
+            a0, a1 = k * np.pi / 4, (k + 1) * np.pi / 4
+            c = r * (1.0 + 0.1 * (k % 2))
+            d += "C {:.3f} {:.3f} {:.3f} {:.3f} {:.3f} {:.3f} ".format(
+                c * np.cos(a0 + 0.26), c * np.sin(a0 + 0.26),
+                c * np.cos(a1 - 0.26), c * np.sin(a1 - 0.26),
+                r * np.cos(a1), r * np.sin(a1))
+        lines.append('<path id="g{}" d="{}Z"/>'.format(s, d))
+    lines.append('</defs>')
+    lines.append('<g>')
+    for i in range(numGlyphs):
+        lines.append('<use x="{:.1f}" y="{:.1f}" xlink:href="#g{}"/>'.format(
+            (i % glyphsPerRow) * 6.0, (i // glyphsPerRow) * 8.0, i % numSymbols))
+    lines.append('</g>')
+    lines.append('</svg>')
+    with open(filePath, "w", encoding="utf-8") as svgFile:
+        svgFile.write("\n".join(lines))
+
+def renderScene(args, name, setup, workers=0):
+    """ Renders the animations returned by `setup(canvas)` and returns its statistics """
+    c = newCanvas(args, name, workers)
+    start = time.perf_counter()
+    animations = setup(c)
+    setupTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    c.animate(*animations)
+    c.close()
+    renderTime = time.perf_counter() - start
+
+    stats = c.getRenderStats()
+    frames = max(stats["frames"], 1)
+    return {
+        "setupSeconds": setupTime,
+        "renderSeconds": renderTime,
+        "frames": stats["frames"],
+        "fps": stats["frames"] / renderTime,
+        "bytesCopiedPerFrame": stats["bytesCopied"] / frames,
+        "phaseMillisecondsPerFrame": {
+            phase: seconds / frames * 1000 for phase, seconds in c.getProfiler().getTotals().items()},
+        "peakRSSMegabytes": peakRSS(),
+    }
+
+def sceneShapes(args):
+    """ Fades in N thousand circles and rectangles """
+    def setup(c):
+        n = int(args.shapes * 1000 / 2)
+        xs = np.linspace(-400, 400, n)
+        shapes = [Circle(x=x, y=np.sin(x) * 100, r=2) for x in xs]
+        shapes += [Rect(x, np.cos(x) * 100, 3, 3) for x in xs]
+        return [FadeIn(*shapes)]
+    return renderScene(args, "shapes", setup)
+
+def newFormula(args, numGlyphs):
+    """ Returns a formula of about `numGlyphs` glyphs (synthetic glyphs if latex is missing) """
+    if shutil.which("latex") is not None and shutil.which("dvisvgm") is not None:
+        # each row of 20 terms `x_{i}^{j}+` has about 90 glyphs
+        numRows = max(round(numGlyphs / 90), 1)
+        expression = "\\\\".join(["+".join(["x_{{{}}}^{{{}}}".format(i, j) for i in range(20)]) for j in range(numRows)])
+        return Latex(expression=expression)
+    filePath = os.path.join(args.tmpdir, "glyphs{}.svg".format(numGlyphs))
+    writeGlyphSvg(filePath, numGlyphs)
+    return SVG(svg=filePath)
+
+def sceneCollection(args):
+    """ Fades in N thousand circles of 8 colors, once as separate circles and once as one `Collection` """
+    n = int(args.shapes * 1000)
+    xs = np.linspace(-400, 400, n)
+    colors = [c.value for c in ColorMap][:8]
+    def setupCircles(c):
+        return [FadeIn(*[Circle(x=x, y=np.sin(x) * 100, r=2, fillColor=colors[i % 8]) for i, x in enumerate(xs)])]
+    def setupCollection(c):
+        return [FadeIn(Collection(*[Circle(x=x, y=np.sin(x) * 100, r=2, fillColor=colors[i % 8]) for i, x in enumerate(xs)]))]
+
+    circles = renderScene(args, "circles", setupCircles)
+    collection = renderScene(args, "collection", setupCollection)
+    circlesDraw = circles["phaseMillisecondsPerFrame"].get("draw:Circle", 0.0)
+    collectionDraw = collection["phaseMillisecondsPerFrame"].get("draw:Collection", 0.0)
+    return {
+        "circlesFps": circles["fps"],
+        "collectionFps": collection["fps"],
+        "circlesDrawMilliseconds": circlesDraw,
+        "collectionDrawMilliseconds": collectionDraw,
+        "drawSpeedup": circlesDraw / max(collectionDraw, 1e-12),
+    }
+
+def sceneLatex(args):
+    """ Fades in a formula of about 500 glyphs """
+    def setup(c):
+        return [FadeIn(newFormula(args, 500))]
+    return renderScene(args, "latex", setup)
+
+def sceneSvg(args):
+    """ Loads a large SVG and unveils it """
+    def setup(c):
+        filePath = os.path.join(args.tmpdir, "large.svg")
+        writeGlyphSvg(filePath, args.svgGlyphs, numSymbols=200, glyphsPerRow=100)
+        return [Unveil(SVG(svg=filePath))]
+    return renderScene(args, "svg", setup)
+
+def sceneTransform(args):
+    """ Transforms a circle into a rectangle """
+    def setup(c):
+        start = Circle(r=50)
+        c.addGeometry(start)
+        return [Transform(start=start, end=Rect(-80, -40, 160, 80))]
+    return renderScene(args, "transform", setup)
+
+def sceneMorph(args):
+    """ Compares splitting random segments one at a time with `Base.resamplePaths` when morphing a line into a 601-point path """
+    def newPaths():
+        line = Line((-100, 0), (100, 0))
+        angles = np.linspace(0, 2*np.pi, 601)
+        target = Line()
+        target.clearPoints()
+        target.addPath()
+        target.addPoint(np.stack((np.cos(angles), np.sin(3*angles)), 1) * 100)
+        return line, target
+
+    line, target = newPaths()
+    start = time.perf_counter()
+    rng = np.random.default_rng(0)
+    while line.getNumPointsPerPath(0) < target.getNumPointsPerPath(0):
+        line.interpolatePath(0, rng=rng)
+    loopTime = time.perf_counter() - start
+
+    line, target = newPaths()
+    start = time.perf_counter()
+    line.resamplePaths([target.getNumPointsPerPath(0)])
+    resampleTime = time.perf_counter() - start
+
+    result = {
+        "loopMilliseconds": loopTime * 1000,
+        "resampleMilliseconds": resampleTime * 1000,
+        "resampleSpeedup": loopTime / resampleTime,
+    }
+    line, target = newPaths()
+    result.update(renderScene(args, "morph", lambda c: [Transform(start=line, end=target)]))
+    return result
+
+def sceneTransforms(args):
+    """ Compares stepping one `Transform` of 30 formulas with 30 `Transform`s of one formula each, then renders the former """
+    def newPairs():
+        starts, ends = [], []
+        for i in range(30):
+            offset = np.array(((i % 6) * 120 - 300, (i // 6) * 60 - 120), dtype=float)
+            starts.append(newFormula(args, 20))
+            starts[-1].translateBy(offset)
+            ends.append(newFormula(args, 30))
+            ends[-1].translateBy(offset + 20)
+        return starts, ends
+
+    def step(animations):
+        # NB: `begin` (matching paths and points) is the same for both
+        numFrames = [a.begin() for a in animations][0]
+        start = time.perf_counter()
+        for _ in range(numFrames):
+            [a.next() for a in animations]
+        return (time.perf_counter() - start) / numFrames
+
+    starts, ends = newPairs()
+    separateTime = step([Transform(e, start=s, fps=args.fps) for s, e in zip(starts, ends)])
+    starts, ends = newPairs()
+    batchedTime = step([Transform(*ends, start=starts, fps=args.fps)])
+
+    result = {
+        "separateMillisecondsPerFrame": separateTime * 1000,
+        "batchedMillisecondsPerFrame": batchedTime * 1000,
+        "batchedSpeedup": separateTime / batchedTime,
+    }
+    starts, ends = newPairs()
+    result.update(renderScene(args, "transforms", lambda c: [Transform(*ends, start=starts)]))
+    return result
+
+def sceneUnveil(args):
+    """ Unveils a row of circles """
+    def setup(c):
+        return [Unveil(*[Circle(x=x, r=10) for x in range(-300, 301, 25)], unveilFrom=UnveilDirections.TOP_LEFT)]
+    return renderScene(args, "unveil", setup)
+
+class GradientUnveil(Unveil):
+    """ The previous `Unveil`, which sets two new gradients on every object for every frame """
+
+    def begin(self) -> int:
+        ret = super().begin()
+        self._targetStrokeColors = [o.getStrokeColor() for o in self._targetObjects]
+        self._targetFillColors = [o.getFillColor() for o in self._targetObjects]
+        [o.setClip(None) for o in self._animatedObjects]
+        [o.setFill(opacity=0.0) for o in self._animatedObjects]
+        [o.setStroke(opacity=0.0) for o in self._animatedObjects]
+        return ret
+
+    def next(self) -> bool:
+        if self._animCounter > self._animationLength():
+            return False
+        if self._animCounter == self._animationLength():
+            self.finish()
+        else:
+            ease = self._easeVals[self._animCounter]
+            for animatedObject, targetStrokeColor, targetFillColor in zip(self._animatedObjects, self._targetStrokeColors, self._targetFillColors):
+                gradients = []
+                for color in [targetStrokeColor, targetFillColor]:
+                    gradient = cairo.LinearGradient(*self._unveilStartStop.reshape((-1,)).tolist())
+                    gradient.add_color_stop_rgba(ease, color[0], color[1], color[2], color[3])
+                    gradient.add_color_stop_rgba(ease, color[0], color[1], color[2], 0.0)
+                    gradients.append(gradient)
+                animatedObject.setStroke(gradient=gradients[0])
+                animatedObject.setFill(gradient=gradients[1])
+        self._animCounter += 1
+        return True
+
+def sceneUnveilGlyphs(args):
+    """ Compares unveiling 200 glyph-sized shapes with the previous gradients and with one shared clip """
+    def newGlyphs():
+        return [Circle(x=(i % 40) * 10 - 200, y=(i // 40) * 12 - 30, r=4) for i in range(200)]
+
+    gradients = renderScene(args, "unveilGradients", lambda c: [GradientUnveil(*newGlyphs())])
+    clip = renderScene(args, "unveilClip", lambda c: [Unveil(*newGlyphs())])
+    result = {}
+    for name, stats in [("gradients", gradients), ("clip", clip)]:
+        result[name + "AnimationMillisecondsPerFrame"] = stats["phaseMillisecondsPerFrame"].get("animation", 0.0)
+        result[name + "DrawMillisecondsPerFrame"] = stats["phaseMillisecondsPerFrame"].get("draw:Circle", 0.0)
+        result[name + "Fps"] = stats["fps"]
+    result["animationSpeedup"] = result["gradientsAnimationMillisecondsPerFrame"] / max(result["clipAnimationMillisecondsPerFrame"], 1e-9)
+    return result
+
+def sceneFadeIn(args):
+    """ Fades in a row of rectangles """
+    def setup(c):
+        return [FadeIn(*[Rect(x, -10, 20, 20) for x in range(-300, 301, 25)])]
+    return renderScene(args, "fadein", setup)
+
+def sceneClone(args):
+    """ Compares deep copies with `Base.copy` of a formula of about 1000 glyphs and fades it in """
+    formula = newFormula(args, 1000)
+    repeats = 20
+
+    start = time.perf_counter()
+    [copy.deepcopy(formula) for _ in range(repeats)]
+    deepcopyTime = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    [formula.copy() for _ in range(repeats)]
+    copyTime = (time.perf_counter() - start) / repeats
+
+    result = {
+        "paths": formula.getNumPaths(),
+        "deepcopyMilliseconds": deepcopyTime * 1000,
+        "copyMilliseconds": copyTime * 1000,
+        "copySpeedup": deepcopyTime / copyTime,
+    }
+    # `FadeIn.begin` copies the formula
+    result.update(renderScene(args, "clone", lambda c: [FadeIn(formula)]))
+    return result
+
+def sceneWorkers(args):
+    """ Compares unveiling a formula above N thousand static circles on one process and on `--workers` processes """
+    def setup(c):
+        xs = np.linspace(-400, 400, int(args.shapes * 1000))
+        c.addGeometry([Circle(x=x, y=np.sin(x) * 100, r=2) for x in xs])
+        # long enough for the start of the workers not to dominate
+        return [Unveil(newFormula(args, 500), duration=4.0)]
+
+    serial = renderScene(args, "serial", setup)
+    parallel = renderScene(args, "workers", setup, workers=args.workers)
+    return {
+        "workers": args.workers,
+        "serialFps": serial["fps"],
+        "workersFps": parallel["fps"],
+        "workersSpeedup": parallel["fps"] / serial["fps"],
+        "copyMillisecondsPerFrame": parallel["phaseMillisecondsPerFrame"].get("copy", 0.0),
+    }
+
+def sceneObjects(args):
+    """ Measures the construction rate and memory per object of N thousand circles, rectangles and lines """
+    n = int(args.shapes * 1000)
+    constructors = {
+        "circle": lambda i: Circle(x=i * 0.01, y=1.0, r=2.0),
+        "rect": lambda i: Rect(i * 0.01, 1.0, 2.0, 3.0),
+        "line": lambda i: Line((i * 0.01, 0.0), (1.0, 1.0)),
+    }
+    result = {}
+    for name, construct in constructors.items():
+        start = time.perf_counter()
+        objects = [construct(i) for i in range(n)]
+        result[name + "PerSecond"] = n / (time.perf_counter() - start)
+        del objects
+
+        tracemalloc.start()
+        objects = [construct(i) for i in range(n)]
+        result[name + "Bytes"] = tracemalloc.get_traced_memory()[0] / n
+        tracemalloc.stop()
+        del objects
+    return result
+
+def sceneFrameCopy(args):
+    """ Compares the bytes copied per frame before the pipe write """
+    c = newCanvas(args, "copy")
+    c.addGeometry([Circle(x=x, r=20) for x in range(-200, 201, 50)])
+    c.wait(1.0)
+    c.close()
+
+    stats = c.getRenderStats()
+    return {
+        # an estimate rather than a measurement: previously, each frame was copied once by `tobytes()`
+        "estimatedBytesCopiedPerFrameBefore": c.getFrameSize(),
+        "bytesCopiedPerFrame": stats["bytesCopied"] / max(stats["frames"], 1),
+    }
+
+SCENES = {
+    "shapes": sceneShapes,
+    "collection": sceneCollection,
+    "latex": sceneLatex,
+    "svg": sceneSvg,
+    "transform": sceneTransform,
+    "morph": sceneMorph,
+    "transforms": sceneTransforms,
+    "unveil": sceneUnveil,
+    "unveilGlyphs": sceneUnveilGlyphs,
+    "fadein": sceneFadeIn,
+    "clone": sceneClone,
+    "workers": sceneWorkers,
+    "objects": sceneObjects,
+    "copy": sceneFrameCopy,
+}
+
+def runScene(name, args):
+    """ Runs a scene in a new process, so that its peak RSS is not that of a previous scene """
+    # NB: unlike those of a `multiprocessing.Pool`, the process may start render workers
+    with concurrent.futures.ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(SCENES[name], args).result()
+
+def main():
+    parser = argparse.ArgumentParser(description="animlib benchmarks")
+    parser.add_argument("scenes", nargs="*", default=list(SCENES.keys()), help="any of: " + ", ".join(SCENES.keys()))
+    parser.add_argument("--width", type=int, default=2560)
+    parser.add_argument("--height", type=int, default=1440)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--sink", choices=["null", "ffmpeg"], default="null", help="discard frames or encode them")
+    parser.add_argument("--shapes", type=float, default=2, help="thousands of shapes in the shapes, collection and objects scenes")
+    parser.add_argument("--workers", type=int, default=4, help="render workers in the workers scene")
+    parser.add_argument("--svgGlyphs", type=int, default=5000, help="glyphs in the svg scene")
+    parser.add_argument("--json", default=None, help="writes the results into this file")
+    args = parser.parse_args()
+
+    results = {"settings": {k: v for k, v in vars(args).items() if k not in ["scenes", "json"]}, "scenes": {}}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        args.tmpdir = tmpdir
+        for name in args.scenes:
+            results["scenes"][name] = runScene(name, args)
+            print("{:<10} {}".format(name, ", ".join(
+                "{}={:.3f}".format(k, v) for k, v in results["scenes"][name].items() if isinstance(v, (int, float)))))
+
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as jsonFile:
+            json.dump(results, jsonFile, indent=2)
+
+if __name__ == "__main__":
+    main()
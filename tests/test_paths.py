@@ -0,0 +1,148 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from animlib.geometies.base import Base
+from animlib.utils.paths import PackedPaths
+
+def newPaths():
+    return PackedPaths([[(0, 0), (1, 0), (1, 1)], [(5, 5), (6, 6)]])
+
+def test_copyIsNotChangedByEdits():
+    paths = newPaths()
+    copy = paths.copy()
+    points = copy.getPoints().copy()
+
+    paths[0] = [(9, 9)]
+    paths.translate(np.array([[1.0, 2.0]]))
+    paths.append([(7, 7)])
+    assert np.array_equal(copy.getPoints(), points)
+    assert len(copy) == 2
+
+def test_editsOfCopyDoNotChangeOriginal():
+    paths = newPaths()
+    copy = paths.copy()
+    points = paths.getPoints().copy()
+    revision = paths.getRevision()
+
+    copy.translate(np.array([[1.0, 0.0]]), 1)
+    del copy[0]
+    copy.insert(0, [(3, 3)])
+    assert np.array_equal(paths.getPoints(), points)
+    assert paths.getRevision() == revision
+    assert np.array_equal(copy[0], [(3, 3)])
+    assert np.array_equal(copy[1], [(6, 5), (7, 6)])
+
+def test_viewsAreReadOnly():
+    paths = newPaths()
+    with pytest.raises(ValueError):
+        paths[0][0, 0] = 1.0
+    with pytest.raises(ValueError):
+        paths.getPoints()[0, 0] = 1.0
+
+def test_appendGrowsByDoubling():
+    paths = PackedPaths()
+    capacities = set()
+    for i in range(100):
+        paths.append([(i, 0), (i, 1)])
+        capacities.add(len(paths._buffer))
+    assert paths.getNumPoints() == 200
+    assert len(capacities) < 10
+    assert np.array_equal(paths[42], [(42, 0), (42, 1)])
+    assert paths.getOffsets().tolist() == list(range(0, 201, 2))
+
+def test_relocateWritesInPlace():
+    paths = newPaths()
+    points = paths.getPoints().copy()
+    buffer = np.zeros((10, 2))
+    revision = paths.getRevision()
+
+    paths.relocate(buffer[2:7])
+    assert np.array_equal(buffer[2:7], points)
+    assert paths.getRevision() != revision
+
+    buffer[2:7] += 1.0
+    paths.touch()
+    assert np.array_equal(paths.getPoints(), points + 1.0)
+
+def test_copyOfRelocatedDoesNotShare():
+    paths = newPaths()
+    buffer = np.zeros((5, 2))
+    paths.relocate(buffer)
+    copy = paths.copy()
+
+    buffer += 1.0
+    assert not np.array_equal(copy.getPoints(), paths.getPoints())
+    copy.translate(np.array([[1.0, 1.0]]))
+    assert np.array_equal(copy.getPoints(), paths.getPoints())
+
+def test_appendMovesOutOfRelocatedBuffer():
+    paths = newPaths()
+    buffer = np.zeros((5, 2))
+    paths.relocate(buffer)
+    paths.append([(8, 8)])
+
+    buffer[:] = -1.0
+    assert np.array_equal(paths[0], [(0, 0), (1, 0), (1, 1)])
+    assert np.array_equal(paths[2], [(8, 8)])
+
+def test_pickleRoundTrip():
+    paths = PackedPaths()
+    [paths.append([(i, i)]) for i in range(5)]
+    assert len(paths._buffer) > paths.getNumPoints()
+
+    result = pickle.loads(pickle.dumps(paths))
+    # the unused capacity is dropped
+    assert len(result._buffer) == result.getNumPoints() == 5
+    assert np.array_equal(result.getPoints(), paths.getPoints())
+    assert result.getOffsets().tolist() == paths.getOffsets().tolist()
+    assert result.getRevision() == paths.getRevision()
+
+    result.append([(9, 9)])
+    assert np.array_equal(result[5], [(9, 9)])
+    assert len(paths) == 5
+
+def test_pickleRoundTripOfRelocated():
+    paths = newPaths()
+    buffer = np.zeros((8, 2))
+    paths.relocate(buffer[1:6])
+
+    result = pickle.loads(pickle.dumps(paths))
+    result.translate(np.array([[1.0, 1.0]]))
+    assert np.array_equal(buffer[1:6], paths.getPoints())
+    assert np.array_equal(result.getPoints(), paths.getPoints() + 1.0)
+
+def test_translateOnePath():
+    paths = newPaths()
+    paths.translate(np.array([[1.0, 1.0]]), 1)
+    assert np.array_equal(paths[0], [(0, 0), (1, 0), (1, 1)])
+    assert np.array_equal(paths[1], [(6, 6), (7, 7)])
+    with pytest.raises(IndexError):
+        paths.translate(np.array([[1.0, 1.0]]), 2)
+    with pytest.raises(TypeError):
+        paths.translate(np.array([[1.0, 1.0]]), 1.0)
+
+def test_translateByMovesOnlyTheSelectedPath():
+    geometry = Base()
+    geometry.addPath([(0, 0), (1, 0), (1, 1)])
+    geometry.addPath([(5, 5), (6, 6)])
+    # the cached outlines must follow the path
+    geometry.getOutline()
+
+    geometry.translateBy((10, 0), pathIdx=1)
+    assert np.array_equal(geometry._paths[0], [(0, 0), (1, 0), (1, 1)])
+    assert np.array_equal(geometry._paths[1], [(15, 5), (16, 6)])
+    assert np.array_equal(geometry.getOutline(0), [(0, 0), (1, 1)])
+    assert np.array_equal(geometry.getOutline(1), [(15, 5), (16, 6)])
+    assert np.array_equal(geometry.getOutline(), [(0, 0), (16, 6)])
+
+def test_releaseMovesOutOfRelocatedBuffer():
+    paths = newPaths()
+    points = paths.getPoints().copy()
+    buffer = np.zeros((5, 2))
+    paths.relocate(buffer)
+    paths.release()
+
+    buffer[:] = -1.0
+    assert np.array_equal(paths.getPoints(), points)
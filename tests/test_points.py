@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from animlib.utils.points import distributeSplits, resampleBeziers, sliceBeziers
+
+def evaluateBezier(controls, t):
+    """ Returns the point of a cubic bezier segment (`4 x 2`) at `t` (Bernstein form) """
+    return ((1-t)**3 * controls[0] + 3 * (1-t)**2 * t * controls[1]
+        + 3 * (1-t) * t**2 * controls[2] + t**3 * controls[3])
+
+def segmentsOf(points):
+    return [points[i:i+4] for i in range(0, len(points) - 1, 3)]
+
+def newPath(numSegments, seed=0):
+    return np.random.default_rng(seed).uniform(-100, 100, (3*numSegments + 1, 2))
+
+@pytest.mark.parametrize("seed", range(20))
+def test_distributeSplitsSumsToTarget(seed):
+    rng = np.random.default_rng(seed)
+    lengths = rng.uniform(0, 10, rng.integers(1, 30))
+    num = int(rng.integers(0, 200))
+    splits = distributeSplits(lengths, num)
+    assert np.sum(splits) == num
+    assert np.all(splits >= 0)
+    # the largest remainder method stays within one split of the exact share
+    assert np.all(np.abs(splits - num * lengths / np.sum(lengths)) < 1)
+
+def test_distributeSplitsOfZeroLengths():
+    splits = distributeSplits([0, 0, 0], 7)
+    assert np.sum(splits) == 7
+    # ties go to the first segments
+    assert splits.tolist() == [3, 2, 2]
+
+def test_distributeSplitsInProportion():
+    assert distributeSplits([1, 3], 8).tolist() == [2, 6]
+    assert distributeSplits([1, 1, 2], 5).tolist() == [1, 1, 3]
+
+def test_sliceBeziersReproducesCurve():
+    points = newPath(3)
+    numSplits = [0, 2, 5]
+    result = sliceBeziers(points, numSplits)
+    assert len(result) == 3 * (3 + sum(numSplits)) + 1
+
+    pieces = segmentsOf(result)
+    for segment, numPieces in zip(segmentsOf(points), np.add(numSplits, 1)):
+        for k in range(numPieces):
+            piece = pieces.pop(0)
+            for u in np.linspace(0, 1, 7):
+                assert np.allclose(evaluateBezier(piece, u), evaluateBezier(segment, (k + u) / numPieces))
+    assert len(pieces) == 0
+
+@pytest.mark.parametrize("numSegments,numPoints", [(1, 4), (1, 13), (2, 22), (5, 49)])
+def test_resampleBeziersReproducesCurve(numSegments, numPoints):
+    points = newPath(numSegments, numSegments)
+    result = resampleBeziers(points, numPoints)
+    assert result.shape == (numPoints, 2)
+    assert np.allclose(result[0], points[0]) and np.allclose(result[-1], points[-1])
+
+    # every original segment is split into pieces of equal parameter range,
+    # i.e. the ends of the pieces are found at the evenly spaced parameters
+    pieces = segmentsOf(result)
+    for segment in segmentsOf(points):
+        numPieces = next(n for n in range(1, len(pieces) + 1)
+            if np.allclose(pieces[n-1][3], segment[3]))
+        for k in range(numPieces):
+            piece = pieces.pop(0)
+            for u in np.linspace(0, 1, 7):
+                assert np.allclose(evaluateBezier(piece, u), evaluateBezier(segment, (k + u) / numPieces))
+    assert len(pieces) == 0
+
+def test_resampleBeziersOfSinglePoint():
+    assert np.array_equal(resampleBeziers([(1, 2)], 7), np.repeat([(1.0, 2.0)], 7, 0))
+
+def test_resampleBeziersRejectsInvalidCounts():
+    points = newPath(2)
+    with pytest.raises(Exception):
+        resampleBeziers(points, 8)
+    with pytest.raises(Exception):
+        resampleBeziers(points, 4)
+    with pytest.raises(Exception):
+        resampleBeziers(points[:5], 8)
@@ -0,0 +1,34 @@
+import numpy as np
+
+from animlib.animations.transform import Transform, _pairPaths
+from animlib.geometies.circle import Circle
+from animlib.geometies.rect import Rect
+
+def test_pairPathsClosestPairsFirst():
+    centers = np.array([(0.0, 0.0), (10.0, 0.0), (20.0, 0.0)])
+    targetCenters = np.array([(11.0, 0.0), (1.0, 0.0), (19.0, 0.0), (12.0, 0.0)])
+    # the fourth target is paired with the path nearest to it
+    assert _pairPaths(centers, targetCenters).tolist() == [1, 0, 2, 1]
+    # the first path goes to the closer of two equally near targets
+    assert _pairPaths(centers[:1], np.array([(1.0, 0.0), (-1.0, 0.0)])).tolist() == [0, 0]
+    assert _pairPaths(centers, targetCenters[:2]).tolist() == [1, 0]
+
+def test_pairPathsWithoutPoints():
+    centers = np.array([(np.nan, np.nan), (5.0, 5.0)])
+    targetCenters = np.array([(np.nan, np.nan), (4.0, 4.0), (6.0, 6.0)])
+    assert _pairPaths(centers, targetCenters).tolist() == [0, 1, 1]
+
+def test_finishReleasesTheAnimatedObjects():
+    start, end = Circle(x=0, y=0, r=10), Rect(50, 0, 10, 10)
+    animation = Transform(start=start, end=end, duration=0.25)
+    animation.setFps(16)
+    animation.begin()
+    while animation.next():
+        pass
+
+    points, style = start.getPoints(), start.getStyle()
+    animation._points[:] = 0.0
+    animation._styles[:] = 0.0
+    assert np.array_equal(start.getPoints(), points)
+    assert np.array_equal(start.getStyle(), style)
+    assert np.allclose(points, end.getPoints())